@@ -1,4 +1,6 @@
-def runge_kutta_4_single(f, y0, x0, h, n):
+import numpy as np
+
+def runge_kutta_4_single(f, y0, x0, h, n, stride=1):
     """
     Implementacion del metodo de Runge-Kutta de orden 4 para una EDO.
     
@@ -7,22 +9,31 @@ def runge_kutta_4_single(f, y0, x0, h, n):
     :param x0: Valor inicial de x
     :param h: Tamaño del paso
     :param n: Número de pasos
-    :return: Listas de valores de x y y
+    :param stride: Guardar solo cada stride pasos (por defecto todos)
+    :return: Arreglos de valores de x y y, de tamaño n // stride + 1
     """
-    x_values = [x0]
-    y_values = [y0]
+    # Trayectoria reservada de antemano y llenada en su lugar
+    filas = n // stride + 1
+    x_values = np.empty(filas)
+    y_values = np.empty(filas)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
     
-    for i in range(n):
+    x_inicial = x0
+    for i in range(1, n + 1):
         k1 = h * f(x0, y0)
         k2 = h * f(x0 + 0.5 * h, y0 + 0.5 * k1)
         k3 = h * f(x0 + 0.5 * h, y0 + 0.5 * k2)
         k4 = h * f(x0 + h, y0 + k3)
         
         y0 = y0 + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        x0 = x0 + h
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
         
-        x_values.append(x0)
-        y_values.append(y0)
+        if i % stride == 0:
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
     
     return x_values, y_values
 
@@ -1,33 +1,457 @@
+import os
+import hashlib
 import numpy as np
 
-def runge_kutta_4_system(f_system, y0, x0, h, n):
+def _derivada_sistema(f_system):
+    """
+    Adapta f_system a una función F(x, y, out) que escribe las derivadas en out.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :return: Función F(x, y, out)
+    """
+    if callable(f_system):
+        def F(x, y, out):
+            out[...] = f_system(x, y)
+            return out
+    else:
+        def F(x, y, out):
+            for i, f in enumerate(f_system):
+                out[i] = f(x, *y)
+            return out
+    return F
+
+def _huella_codigo(codigo):
+    """ Bytes que identifican un objeto de código: instrucciones, nombres y constantes. """
+    partes = [codigo.co_code, repr(codigo.co_names).encode()]
+    for constante in codigo.co_consts:
+        # Las funciones anidadas aparecen como objetos de código (su repr trae una dirección)
+        partes.append(_huella_codigo(constante) if hasattr(constante, 'co_code') else repr(constante).encode())
+    return b'|'.join(partes)
+
+def _huella_funcion(f, profundidad=2):
+    """
+    Identidad estable de una función para la clave del checkpoint: nombre calificado,
+    código, constantes, valores de las variables capturadas y de las globales simples
+    (números, cadenas y arreglos) que usa. Así, cambiar un coeficiente del modelo,
+    escrito en el código o en una variable global, cambia la huella.
+    """
+    codigo = getattr(f, '__code__', None)
+    if codigo is None:
+        # Funciones de NumPy, clases invocables, ...: solo el tipo y el nombre
+        return f"{type(f).__qualname__}:{getattr(f, '__qualname__', '')}".encode()
+    
+    def valor(v):
+        if isinstance(v, np.ndarray):
+            return repr((v.dtype.str, v.shape)).encode() + v.tobytes()
+        if isinstance(v, (bool, int, float, complex, str, bytes, tuple, type(None))):
+            return repr(v).encode()
+        if callable(v) and profundidad > 0:
+            return _huella_funcion(v, profundidad - 1)
+        return type(v).__qualname__.encode()
+    
+    partes = [f.__qualname__.encode(), _huella_codigo(codigo), valor(f.__defaults__)]
+    partes += [valor(celda.cell_contents) for celda in f.__closure__ or ()]
+    partes += [nombre.encode() + b'=' + valor(f.__globals__[nombre])
+               for nombre in codigo.co_names if nombre in f.__globals__]
+    return hashlib.sha1(b'|'.join(partes)).digest()
+
+class SolucionDensa:
+    """
+    Salida densa de Runge-Kutta: interpolación cúbica de Hermite en cada paso.
+    
+    Con los valores y las derivadas guardados en cada paso, la solución se puede evaluar
+    en cualquier x del intervalo integrado sin volver a integrar.
+    """
+    def __init__(self, x_values, y_values, dy_values):
+        """
+        :param x_values: Arreglo con los valores de x de cada paso
+        :param y_values: Valores de y en cada paso, de forma (n + 1, ...)
+        :param dy_values: Derivadas dy/dx en cada paso, de la misma forma que y_values
+        """
+        self.x = x_values
+        self.y = y_values
+        self.dy = dy_values
+    
+    def __call__(self, x):
+        """
+        Evalúa la solución en x (escalar o arreglo de cualquier forma).
+        
+        :param x: Valores de x dentro de [x0, x_final]
+        :return: Valores de y de forma x.shape + forma de un estado
+        """
+        x = np.asarray(x, dtype=float)
+        # Se aceptan unos pocos ulps fuera de los extremos (redondeo de x0 + n*h) y se recortan
+        tolerancia = 4 * np.spacing(max(abs(self.x[0]), abs(self.x[-1])))
+        if np.any(x < self.x[0] - tolerancia) or np.any(x > self.x[-1] + tolerancia):
+            raise ValueError(f"x fuera del intervalo integrado [{self.x[0]}, {self.x[-1]}]")
+        x = np.clip(x, self.x[0], self.x[-1])
+        
+        i = np.clip(np.searchsorted(self.x, x, side='right') - 1, 0, len(self.x) - 2)
+        h = self.x[i + 1] - self.x[i]
+        s = (x - self.x[i]) / h
+        
+        # Bases de Hermite, con ejes extra para el estado
+        forma = x.shape + (1,) * (self.y.ndim - 1)
+        h00 = ((1 + 2 * s) * (1 - s) ** 2).reshape(forma)
+        h10 = (s * (1 - s) ** 2 * h).reshape(forma)
+        h01 = (s ** 2 * (3 - 2 * s)).reshape(forma)
+        h11 = (s ** 2 * (s - 1) * h).reshape(forma)
+        return h00 * self.y[i] + h10 * self.dy[i] + h01 * self.y[i + 1] + h11 * self.dy[i + 1]
+
+def runge_kutta_4_system(f_system, y0, x0, h, n, stride=1, eventos=None, al_evento=None, densa=False,
+                         salida=None, bloque=4096, checkpoint=None, cada_checkpoint=100000, al_paso=None):
     """
     Implementacion del metodo de Runge-Kutta de orden 4 para un sistema de EDOs.
     
-    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm]
+    Los eventos son funciones g(x, y) cuyos cruces por cero se localizan durante la
+    integración (interpolando linealmente g entre pasos), sin guardar la trayectoria.
+    Por ejemplo, los máximos de y1 son los cruces de dy1/dx de positivo a negativo.
+    
+    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm],
+                     o una sola función vectorial f(x, y) que devuelve las m derivadas
     :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
     :param x0: Valor inicial de x
     :param h: Tamaño del paso
     :param n: Número de pasos
-    :return: Lista de valores de x y matriz de valores de y
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param eventos: Lista de tuplas (g, direccion); direccion = -1 detecta cruces de
+                    positivo a negativo, 1 de negativo a positivo y 0 ambos
+    :param al_evento: Función opcional al_evento(indice, x, y) llamada en cada evento
+    :param densa: Si es True se guardan también las derivadas y, en lugar de los arreglos
+                  de x y de y, se devuelve una SolucionDensa evaluable en cualquier x
+                  (requiere stride=1)
+    :param salida: Ruta de un archivo .npy donde se escribe la trayectoria por bloques;
+                   cada fila es [x, y1, ..., ym] y en memoria solo se mantiene un bloque
+    :param bloque: Número de filas que se acumulan antes de escribirlas en salida
+    :param checkpoint: Ruta de un archivo .npz donde se guarda el estado cada
+                       cada_checkpoint pasos. Si el archivo ya existe, la integración se
+                       reanuda desde él y el resultado es idéntico bit a bit al de una
+                       ejecución sin interrupciones; se borra al terminar. Sin salida, cada
+                       checkpoint vuelve a guardar toda la trayectoria acumulada en memoria
+                       (y las derivadas si densa=True), un costo O(n) por checkpoint: para
+                       integraciones largas conviene usar salida o stride=None
+    :param cada_checkpoint: Número de pasos entre checkpoints
+    :param al_paso: Función opcional al_paso(i, x, y) llamada tras cada paso i, para
+                    reducir la trayectoria sobre la marcha (y es el búfer del estado:
+                    copiarlo si se quiere conservar)
+    :return: Arreglo de valores de x, de tamaño n // stride + 1, y matriz de valores
+             de y de forma (n // stride + 1, m). Si hay eventos se devuelve además una
+             lista con un diccionario por evento con 'n', 't_primero', 't_ultimo' y
+             'periodo' (separación media entre eventos consecutivos). Con salida, los
+             arreglos de x y de y son vistas de solo lectura del archivo (np.memmap)
+    """
+    if densa and stride != 1:
+        raise ValueError("La salida densa necesita todos los pasos (stride=1)")
+    if densa and salida is not None:
+        raise ValueError("La salida densa no se puede combinar con salida a archivo")
+    
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    x_inicial = x0
+    inicio = 1
+    
+    if checkpoint is not None:
+        # Huella de la configuración, para no reanudar con otros parámetros
+        # (incluye el modelo y los eventos, para no empalmar dos EDO distintas, y la ruta
+        # de salida, que al reanudar se abre en modo 'r+')
+        funciones = [f_system] if callable(f_system) else list(f_system)
+        funciones += [g for g, _ in eventos or ()]
+        clave = hashlib.sha1(repr((x0, h, n, stride, y0.shape, densa,
+                                   None if salida is None else os.path.abspath(salida),
+                                   0 if eventos is None else [d for _, d in eventos])).encode()
+                             + y0.tobytes()
+                             + b''.join(_huella_funcion(f) for f in funciones)).hexdigest()
+        reanudar = os.path.exists(checkpoint)
+        if reanudar:
+            estado = np.load(checkpoint)
+            if str(estado['clave']) != clave:
+                raise ValueError(f"El checkpoint {checkpoint} corresponde a otra configuración")
+    
+    # Trayectoria reservada de antemano y llenada en su lugar. Con salida solo se
+    # reserva un bloque de filas, que se escribe en el archivo cada vez que se llena
+    filas = 1 if stride is None else n // stride + 1
+    capacidad = filas if salida is None else min(bloque, filas)
+    x_values = np.empty(capacidad)
+    y_values = np.empty((capacidad,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    if salida is not None:
+        modo = 'r+' if checkpoint is not None and reanudar else 'w+'
+        datos = np.lib.format.open_memmap(salida, mode=modo, dtype=float, shape=(filas, 1 + y0.size))
+        escritas = 0
+    if densa:
+        dy_values = np.empty_like(y_values)
+    
+    # Estado de los eventos: solo contadores, memoria constante
+    if eventos is not None:
+        g_anterior = [g(x0, y0) for g, _ in eventos]
+        info_eventos = [{'n': 0, 't_primero': np.nan, 't_ultimo': np.nan} for _ in eventos]
+    
+    if checkpoint is not None and reanudar:
+        # Restaurar exactamente el estado guardado tras el paso estado['paso']
+        inicio = int(estado['paso']) + 1
+        x0 = estado['x'][()]
+        y0[...] = estado['y']
+        fila = int(estado['fila'])
+        x_values[:fila] = estado['x_values']
+        y_values[:fila] = estado['y_values']
+        if salida is not None:
+            escritas = int(estado['escritas'])
+        if densa:
+            dy_values[:inicio - 1] = estado['dy_values']
+        if eventos is not None:
+            g_anterior = list(estado['g_anterior'])
+            for e, info in enumerate(info_eventos):
+                info['n'] = int(estado['eventos_n'][e])
+                info['t_primero'] = estado['eventos_t_primero'][e]
+                info['t_ultimo'] = estado['eventos_t_ultimo'][e]
+    
+    # Buffers de las etapas, se reservan una sola vez
+    k1 = np.empty_like(y0)
+    k2 = np.empty_like(y0)
+    k3 = np.empty_like(y0)
+    k4 = np.empty_like(y0)
+    y_tmp = np.empty_like(y0)
+    
+    for i in range(inicio, n + 1):
+        F(x0, y0, k1)
+        if densa:
+            dy_values[i - 1] = k1
+        np.multiply(k1, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k2)
+        np.multiply(k2, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k3)
+        np.multiply(k3, h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + h, y_tmp, k4)
+        
+        # y0 += h * (k1 + 2 * k2 + 2 * k3 + k4) / 6, sin temporales
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        y0 += k2
+        x_anterior = x0
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
+        if al_paso is not None:
+            al_paso(i, x0, y0)
+        
+        if stride is not None and i % stride == 0:
+            if fila == capacidad:
+                datos[escritas:escritas + fila, 0] = x_values
+                datos[escritas:escritas + fila, 1:] = y_values.reshape(fila, -1)
+                escritas += fila
+                fila = 0
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
+        
+        if eventos is not None:
+            for e, (g, direccion) in enumerate(eventos):
+                g_prev = g_anterior[e]
+                g_nuevo = g(x0, y0)
+                if ((direccion <= 0 and g_prev > 0 and g_nuevo <= 0) or
+                        (direccion >= 0 and g_prev < 0 and g_nuevo >= 0)):
+                    x_evento = x_anterior + h * g_prev / (g_prev - g_nuevo)
+                    info = info_eventos[e]
+                    if info['n'] == 0:
+                        info['t_primero'] = x_evento
+                    info['n'] += 1
+                    info['t_ultimo'] = x_evento
+                    if al_evento is not None:
+                        al_evento(e, x_evento, y0)
+                g_anterior[e] = g_nuevo
+        
+        if checkpoint is not None and i % cada_checkpoint == 0 and i < n:
+            if salida is not None and fila > 0:
+                # Lo pendiente se escribe primero, así el checkpoint solo guarda el estado
+                datos[escritas:escritas + fila, 0] = x_values[:fila]
+                datos[escritas:escritas + fila, 1:] = y_values[:fila].reshape(fila, -1)
+                datos.flush()
+                escritas += fila
+                fila = 0
+            estado = {'clave': clave, 'paso': i, 'x': x0, 'y': y0, 'fila': fila,
+                      'x_values': x_values[:fila], 'y_values': y_values[:fila]}
+            if salida is not None:
+                estado['escritas'] = escritas
+            if densa:
+                estado['dy_values'] = dy_values[:i]
+            if eventos is not None:
+                estado['g_anterior'] = np.array(g_anterior)
+                estado['eventos_n'] = [info['n'] for info in info_eventos]
+                estado['eventos_t_primero'] = [info['t_primero'] for info in info_eventos]
+                estado['eventos_t_ultimo'] = [info['t_ultimo'] for info in info_eventos]
+            # Escritura atómica: un corte a mitad de escritura no daña el checkpoint anterior
+            temporal = checkpoint + '.tmp.npz'
+            np.savez(temporal, **estado)
+            os.replace(temporal, checkpoint)
+    
+    if stride is None:
+        # La única fila es el estado final (aunque un checkpoint ya haya escrito la inicial)
+        x_values[0] = x0
+        y_values[0] = y0
+        fila = 1
+        if salida is not None:
+            escritas = 0
+    
+    if salida is not None:
+        if fila > 0:
+            datos[escritas:escritas + fila, 0] = x_values[:fila]
+            datos[escritas:escritas + fila, 1:] = y_values[:fila].reshape(fila, -1)
+        datos.flush()
+        datos = np.load(salida, mmap_mode='r')
+        x_values = datos[:, 0]
+        y_values = datos[:, 1:].reshape((filas,) + y0.shape)
+    
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    
+    if eventos is not None:
+        for info in info_eventos:
+            info['periodo'] = (info['t_ultimo'] - info['t_primero']) / (info['n'] - 1) if info['n'] > 1 else np.nan
+    
+    if densa:
+        F(x0, y0, dy_values[n])
+        resultado = (SolucionDensa(x_values, y_values, dy_values),)
+    else:
+        resultado = (x_values, y_values)
+    
+    if eventos is not None:
+        return resultado + (info_eventos,)
+    return resultado[0] if densa else resultado
+
+def runge_kutta_4_ensemble(f_system, Y0, x0, h, n, stride=1, al_paso=None):
+    """
+    Integra muchas condiciones iniciales a la vez con Runge-Kutta de orden 4.
+    
+    El estado se avanza como un solo arreglo de forma (m, n_ic), por lo que f_system
+    recibe arreglos con una entrada por condición inicial en lugar de escalares.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :param Y0: Arreglo (n_ic, m) con una condición inicial por fila
+    :param x0: Valor inicial de x
+    :param h: Tamaño del paso
+    :param n: Número de pasos
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param al_paso: Función opcional al_paso(i, x, Y) llamada tras cada paso, con Y de
+                    forma (n_ic, m)
+    :return: Arreglo de valores de x y arreglo de valores de y de forma
+             (n // stride + 1, n_ic, m)
+    """
+    Y0 = np.asarray(Y0, dtype=float)
+    if al_paso is not None:
+        al_paso_sistema = lambda i, x, y: al_paso(i, x, y.T)
+    else:
+        al_paso_sistema = None
+    x_values, y_values = runge_kutta_4_system(f_system, Y0.T, x0, h, n, stride, al_paso=al_paso_sistema)
+    return x_values, y_values.transpose(0, 2, 1)
+
+# Coeficientes de Dormand-Prince 5(4)
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+# Diferencia entre la solución de orden 5 y la de orden 4 (estimador del error)
+_DP_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+def runge_kutta_45_system(f_system, y0, x0, x_final, rtol=1e-6, atol=1e-9, h0=None, max_pasos=1000000):
     """
-    m = len(y0)
-    x_values = [x0]
-    y_values = [y0]
+    Método adaptativo de Runge-Kutta de Dormand-Prince 5(4) para un sistema de EDOs.
     
-    for i in range(n):
-        k1 = np.array([h * f(x0, *y0) for f in f_system])
-        k2 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k1)) for f in f_system])
-        k3 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k2)) for f in f_system])
-        k4 = np.array([h * f(x0 + h, *(y0 + k3)) for f in f_system])
+    El tamaño del paso se ajusta para que el error local estimado quede por debajo de
+    atol + rtol * |y|; los pasos que no cumplen la tolerancia se rechazan y se repiten.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
+    :param x0: Valor inicial de x
+    :param x_final: Valor final de x
+    :param rtol: Tolerancia relativa
+    :param atol: Tolerancia absoluta
+    :param h0: Tamaño del primer paso (si es None se estima automáticamente)
+    :param max_pasos: Número máximo de pasos aceptados
+    :return: Arreglo de valores de x, matriz de valores de y y diccionario con las
+             estadísticas 'pasos_aceptados', 'pasos_rechazados' y 'evaluaciones'
+    """
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    estadisticas = {'pasos_aceptados': 0, 'pasos_rechazados': 0, 'evaluaciones': 0}
+    
+    # Trayectoria en un arreglo que se duplica cuando se llena
+    capacidad = 64
+    x_values = np.empty(capacidad)
+    y_values = np.empty((capacidad,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    
+    K = np.empty((7,) + y0.shape)
+    y_tmp = np.empty_like(y0)
+    y_nuevo = np.empty_like(y0)
+    error = np.empty_like(y0)
+    F(x0, y0, K[0])
+    estadisticas['evaluaciones'] += 1
+    
+    if h0 is None:
+        # Estimación del primer paso (Hairer, Nørsett y Wanner)
+        escala = atol + rtol * np.abs(y0)
+        d0 = np.sqrt(np.mean((y0 / escala) ** 2))
+        d1 = np.sqrt(np.mean((K[0] / escala) ** 2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        h0 = min(h0, x_final - x0)
+    h = h0
+    
+    while x0 < x_final:
+        if estadisticas['pasos_aceptados'] >= max_pasos:
+            raise RuntimeError(f"Se alcanzó el máximo de {max_pasos} pasos en x = {x0}")
+        h = min(h, x_final - x0)
+        
+        for s in range(1, 7):
+            y_tmp[...] = y0
+            for j, a in enumerate(_DP_A[s]):
+                if a != 0:
+                    y_tmp += (h * a) * K[j]
+            F(x0 + _DP_C[s] * h, y_tmp, K[s])
+        estadisticas['evaluaciones'] += 6
+        # La última etapa se evalúa en la solución de orden 5 (FSAL)
+        y_nuevo[...] = y_tmp
         
-        y0 = y0 + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        x0 = x0 + h
+        error[...] = np.tensordot(h * _DP_E, K, axes=1)
+        escala = atol + rtol * np.maximum(np.abs(y0), np.abs(y_nuevo))
+        norma = np.sqrt(np.mean((error / escala) ** 2))
         
-        x_values.append(x0)
-        y_values.append(y0)
+        if norma <= 1:
+            x0 = x0 + h
+            y0[...] = y_nuevo
+            K[0] = K[6]
+            estadisticas['pasos_aceptados'] += 1
+            
+            if fila == capacidad:
+                capacidad *= 2
+                x_values = np.resize(x_values, capacidad)
+                y_values = np.resize(y_values, (capacidad,) + y0.shape)
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
+            
+            factor = 5.0 if norma == 0 else min(5.0, 0.9 * norma ** -0.2)
+        else:
+            estadisticas['pasos_rechazados'] += 1
+            factor = max(0.2, 0.9 * norma ** -0.2)
+        h = h * factor
     
-    return x_values, y_values
+    return x_values[:fila], y_values[:fila], estadisticas
 
 # Ejemplo de un sistema de EDOs:
 # y1' = -2 * x * y1
@@ -50,3 +474,65 @@ x_values, y_values = runge_kutta_4_system([f1, f2], y0, x0, h, n)
 print("Valor para x1 y x2 ", x_values)
 print("")
 print("Valor para y1 y y2", y_values)
+
+# El mismo sistema como una sola función vectorial: una llamada por etapa
+def f_vector(x, y):
+    y1, y2 = y
+    return np.array([-2 * x * y1, x**2 * y2])
+
+x_values, y_values = runge_kutta_4_system(f_vector, y0, x0, h, n)
+print("")
+print("Valor para y1 y y2 (modo vectorial)", y_values)
+
+# Varias condiciones iniciales avanzadas juntas en una sola llamada
+Y0 = np.array([[1, 1], [2, 0.5], [0.5, 2]])
+x_values, y_values = runge_kutta_4_ensemble(f_vector, Y0, x0, h, n)
+print("")
+print("Valores finales de y1 y y2 para cada condición inicial", y_values[-1])
+
+# Integración adaptativa con control del error hasta x = 1
+x_values, y_values, estadisticas = runge_kutta_45_system(f_vector, y0, x0, 1.0, rtol=1e-8, atol=1e-10)
+print("")
+print("Valor final de y1 y y2 (RK45 adaptativo)", y_values[-1])
+print("Estadísticas del paso adaptativo", estadisticas)
+
+# Eventos sin guardar la trayectoria: máximos de y1 en el oscilador y1' = y2, y2' = -y1
+def oscilador(x, y):
+    y1, y2 = y
+    return np.array([y2, -y1])
+
+def dy1_dx(x, y):
+    return y[1]
+
+def reportar_maximo(indice, x, y):
+    print(f"Máximo de y1 en x = {x:.4f}")
+
+x_values, y_values, eventos = runge_kutta_4_system(oscilador, [1, 0], 0, 0.01, 2000, stride=None,
+                                                   eventos=[(dy1_dx, -1)], al_evento=reportar_maximo)
+print("Período estimado del oscilador", eventos[0]['periodo'], "(exacto: 2*pi =", 2 * np.pi, ")")
+
+# Salida densa: una sola integración y consultas en cualquier x del intervalo
+solucion = runge_kutta_4_system(f_vector, y0, x0, h, n, densa=True)
+x_consulta = np.array([0.05, 0.33, 0.77])
+print("")
+print("Valores de y1 y y2 en x =", x_consulta, solucion(x_consulta))
+print("Valores exactos de y1", np.exp(-x_consulta**2))
+
+# Trayectoria larga escrita por bloques en un archivo .npy en lugar de en memoria
+import tempfile
+from scipy.signal import find_peaks
+
+ruta = os.path.join(tempfile.gettempdir(), 'oscilador.npy')
+runge_kutta_4_system(oscilador, [1, 0], 0, 0.01, 200000, salida=ruta, bloque=10000)
+
+# Lectura perezosa: solo se cargan las páginas del archivo que se usan
+datos = np.load(ruta, mmap_mode='r')
+picos, _ = find_peaks(datos[:, 1])
+print("")
+print("Filas en disco", datos.shape[0], "- período estimado con find_peaks", np.mean(np.diff(datos[picos, 0])))
+
+# Checkpoints periódicos: si el proceso se interrumpe, repetir la misma llamada reanuda
+# la integración desde el último checkpoint con el mismo resultado bit a bit
+ruta_checkpoint = os.path.join(tempfile.gettempdir(), 'oscilador_checkpoint.npz')
+runge_kutta_4_system(oscilador, [1, 0], 0, 0.01, 200000, salida=ruta, bloque=10000,
+                     checkpoint=ruta_checkpoint, cada_checkpoint=50000)
@@ -1,34 +1,70 @@
 import numpy as np
-from scipy.optimize import fsolve
 
 # Definir la función que describe el sistema de EDO
+# (acepta puntos sueltos o arreglos de forma (2, k) con k puntos a la vez)
 def sistema(puntos):
     x, y = puntos
-    return [0.2 * x - 0.005 * x * y, -0.5 * y + 0.01 * x * y]
-
-# Encontrar los puntos de equilibrio utilizando fsolve
-puntos_iniciales = [1, 1]
-equilibrio = fsolve(sistema, puntos_iniciales)
-print(f"Punto de equilibrio: {equilibrio}")
+    return np.array([0.2 * x - 0.005 * x * y, -0.5 * y + 0.01 * x * y])
 
 # Definir la función que calcula la matriz Jacobiana
+# (para k puntos devuelve un arreglo apilado de forma (k, 2, 2))
 def jacobiano(punto):
-    x, y = punto
-    return np.array([[0.2 - 0.005 * y, -0.005 * x],
-                     [0.01 * y, -0.5 + 0.01 * x]])
+    x, y = np.asarray(punto, dtype=float)
+    J = np.empty(np.shape(x) + (2, 2))
+    J[..., 0, 0] = 0.2 - 0.005 * y
+    J[..., 0, 1] = -0.005 * x
+    J[..., 1, 0] = 0.01 * y
+    J[..., 1, 1] = -0.5 + 0.01 * x
+    return J
+
+def buscar_equilibrios(sistema, jacobiano, semillas, tol=1e-10, max_iter=100, decimales=6):
+    """
+    Busca todos los puntos de equilibrio con Newton desde muchas semillas a la vez.
+    
+    :param sistema: Función del sistema, evaluable en arreglos de forma (2, k)
+    :param jacobiano: Jacobiana analítica, devuelve arreglos de forma (k, 2, 2)
+    :param semillas: Arreglo (k, 2) de puntos iniciales
+    :param tol: Tolerancia sobre |F| para aceptar una raíz
+    :param max_iter: Número máximo de iteraciones de Newton
+    :param decimales: Decimales usados para eliminar raíces repetidas
+    :return: Arreglo (n_eq, 2) con los equilibrios distintos encontrados
+    """
+    P = np.array(semillas, dtype=float).T
+    with np.errstate(all='ignore'):
+        for _ in range(max_iter):
+            F = sistema(P)
+            J = jacobiano(P)
+            # Paso de Newton resolviendo los sistemas 2x2 de forma explícita
+            det = J[:, 0, 0] * J[:, 1, 1] - J[:, 0, 1] * J[:, 1, 0]
+            dx = (J[:, 1, 1] * F[0] - J[:, 0, 1] * F[1]) / det
+            dy = (J[:, 0, 0] * F[1] - J[:, 1, 0] * F[0]) / det
+            P = P - np.array([dx, dy])
+        residuo = np.max(np.abs(sistema(P)), axis=0)
+    raices = P.T[np.isfinite(residuo) & (residuo < tol)]
+    return np.unique(np.round(raices, decimales) + 0.0, axis=0)
+
+def clasificar(eigenvalores):
+    """
+    Clasifica los equilibrios según los valores propios de sus Jacobianas.
+    
+    :param eigenvalores: Arreglo (n_eq, 2) de valores propios
+    :return: Arreglo con la clasificación de cada equilibrio
+    """
+    reales = np.real(eigenvalores)
+    return np.where(np.all(reales < 0, axis=1), "nodo atractivo (estable)",
+           np.where(np.all(reales > 0, axis=1), "nodo repulsivo (inestable)",
+           np.where(np.all(np.iscomplex(eigenvalores), axis=1), "foco", "silla")))
+
+# Encontrar los puntos de equilibrio desde una grilla de semillas
+X, Y = np.meshgrid(np.linspace(-10, 200, 20), np.linspace(-10, 200, 20))
+semillas = np.column_stack((X.ravel(), Y.ravel()))
+equilibrios = buscar_equilibrios(sistema, jacobiano, semillas)
 
-# Calcular la matriz Jacobiana en el punto de equilibrio
-J = jacobiano(equilibrio)
-eigenvalores = np.linalg.eigvals(J)
-print(f"Valores propios de la matriz Jacobiana: {eigenvalores}")
+# Valores propios de todas las Jacobianas apiladas en una sola llamada
+eigenvalores = np.linalg.eigvals(jacobiano(equilibrios.T))
+clasificaciones = clasificar(eigenvalores)
 
-# Clasificación del punto de equilibrio
-if np.all(np.real(eigenvalores) < 0):
-    print("El punto de equilibrio es un nodo atractivo (estable).")
-elif np.all(np.real(eigenvalores) > 0):
-    print("El punto de equilibrio es un nodo repulsivo (inestable).")
-else:
-    if np.all(np.iscomplex(eigenvalores)):
-        print("El punto de equilibrio es un foco.")
-    else:
-        print("El punto de equilibrio es una silla.")
+for equilibrio, valores, clase in zip(equilibrios, eigenvalores, clasificaciones):
+    print(f"Punto de equilibrio: {equilibrio}")
+    print(f"Valores propios de la matriz Jacobiana: {valores}")
+    print(f"El punto de equilibrio es: {clase}.")
@@ -1,33 +1,123 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import find_peaks
 
-def runge_kutta_4_system(f_system, y0, x0, h, n):
+def _derivada_sistema(f_system):
     """
-    Implementación del método de Runge-Kutta de orden 4 para un sistema de EDOs.
+    Adapta f_system a una función F(x, y, out) que escribe las derivadas en out.
     
-    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm]
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :return: Función F(x, y, out)
+    """
+    if callable(f_system):
+        def F(x, y, out):
+            out[...] = f_system(x, y)
+            return out
+    else:
+        def F(x, y, out):
+            for i, f in enumerate(f_system):
+                out[i] = f(x, *y)
+            return out
+    return F
+
+def runge_kutta_4_system(f_system, y0, x0, h, n, stride=1, eventos=None, al_evento=None):
+    """
+    Implementación del metodo de Runge-Kutta de orden 4 para un sistema de EDOs.
+    
+    Los eventos son funciones g(x, y) cuyos cruces por cero se localizan durante la
+    integración (interpolando linealmente g entre pasos), sin guardar la trayectoria.
+    Por ejemplo, los máximos de y1 son los cruces de dy1/dx de positivo a negativo.
+    
+    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm],
+                     o una sola función vectorial f(x, y) que devuelve las m derivadas
     :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
     :param x0: Valor inicial de x
     :param h: Tamaño del paso
     :param n: Número de pasos
-    :return: Lista de valores de x y matriz de valores de y
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param eventos: Lista de tuplas (g, direccion); direccion = -1 detecta cruces de
+                    positivo a negativo, 1 de negativo a positivo y 0 ambos
+    :param al_evento: Función opcional al_evento(indice, x, y) llamada en cada evento
+    :return: Arreglo de valores de x, de tamaño n // stride + 1, y matriz de valores
+             de y de forma (n // stride + 1, m). Si hay eventos se devuelve además una
+             lista con un diccionario por evento con 'n', 't_primero', 't_ultimo' y
+             'periodo' (separación media entre eventos consecutivos)
     """
-    m = len(y0)
-    x_values = [x0]
-    y_values = [y0]
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    
+    # Trayectoria reservada de antemano y llenada en su lugar
+    filas = 1 if stride is None else n // stride + 1
+    x_values = np.empty(filas)
+    y_values = np.empty((filas,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
     
-    for i in range(n):
-        k1 = np.array([h * f(x0, *y0) for f in f_system])
-        k2 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k1)) for f in f_system])
-        k3 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k2)) for f in f_system])
-        k4 = np.array([h * f(x0 + h, *(y0 + k3)) for f in f_system])
+    # Estado de los eventos: solo contadores, memoria constante
+    if eventos is not None:
+        g_anterior = [g(x0, y0) for g, _ in eventos]
+        info_eventos = [{'n': 0, 't_primero': np.nan, 't_ultimo': np.nan} for _ in eventos]
+    
+    # Buffers de las etapas, se reservan una sola vez
+    k1 = np.empty_like(y0)
+    k2 = np.empty_like(y0)
+    k3 = np.empty_like(y0)
+    k4 = np.empty_like(y0)
+    y_tmp = np.empty_like(y0)
+    
+    x_inicial = x0
+    for i in range(1, n + 1):
+        F(x0, y0, k1)
+        np.multiply(k1, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k2)
+        np.multiply(k2, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k3)
+        np.multiply(k3, h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + h, y_tmp, k4)
+        
+        # y0 += h * (k1 + 2 * k2 + 2 * k3 + k4) / 6, sin temporales
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        y0 += k2
+        x_anterior = x0
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
         
-        y0 = y0 + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        x0 = x0 + h
+        if stride is not None and i % stride == 0:
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
         
-        x_values.append(x0)
-        y_values.append(y0)
+        if eventos is not None:
+            for e, (g, direccion) in enumerate(eventos):
+                g_prev = g_anterior[e]
+                g_nuevo = g(x0, y0)
+                if ((direccion <= 0 and g_prev > 0 and g_nuevo <= 0) or
+                        (direccion >= 0 and g_prev < 0 and g_nuevo >= 0)):
+                    x_evento = x_anterior + h * g_prev / (g_prev - g_nuevo)
+                    info = info_eventos[e]
+                    if info['n'] == 0:
+                        info['t_primero'] = x_evento
+                    info['n'] += 1
+                    info['t_ultimo'] = x_evento
+                    if al_evento is not None:
+                        al_evento(e, x_evento, y0)
+                g_anterior[e] = g_nuevo
+    
+    if stride is None:
+        x_values[0] = x0
+        y_values[0] = y0
+    
+    if eventos is not None:
+        for info in info_eventos:
+            info['periodo'] = (info['t_ultimo'] - info['t_primero']) / (info['n'] - 1) if info['n'] > 1 else np.nan
+        return x_values, y_values, info_eventos
     
     return x_values, y_values
 
@@ -35,11 +125,17 @@ def runge_kutta_4_system(f_system, y0, x0, h, n):
 # x'(t) = 0.2 * x - 0.005 * x * y
 # y'(t) = -0.5 * y + 0.01 * x * y
 
-def f1(t, x, y):
-    return 0.2 * x - 0.005 * x * y
+def f_sistema(t, estado):
+    x, y = estado
+    return np.array([0.2 * x - 0.005 * x * y,
+                     -0.5 * y + 0.01 * x * y])
+
+# Eventos: los máximos de x(t) e y(t) son los cruces de dx/dt y dy/dt de positivo a negativo
+def dx_dt(t, estado):
+    return f_sistema(t, estado)[0]
 
-def f2(t, x, y):
-    return -0.5 * y + 0.01 * x * y
+def dy_dt(t, estado):
+    return f_sistema(t, estado)[1]
 
 # Parámetros
 x0 = 100  # Valor inicial de x(t)
@@ -48,8 +144,8 @@ h = 0.1   # Tamaño de paso (1 mes)
 n = int(5 * 12 / h)  # 5 años en pasos de h meses
 
 # Solución
-t_values, populations = runge_kutta_4_system([f1, f2], [x0, y0], 0, h, n)
-populations = np.array(populations)
+t_values, populations, maximos = runge_kutta_4_system(f_sistema, [x0, y0], 0, h, n,
+                                                       eventos=[(dx_dt, -1), (dy_dt, -1)])
 x_values = populations[:, 0]
 y_values = populations[:, 1]
 
@@ -69,18 +165,17 @@ print(f"Población de x después de 5 años: {x_values[-1]:.2f}")
 print(f"Población de y después de 5 años: {y_values[-1]:.2f}")
 
 # Estimar el período o ciclo de repetición
-# Identificar puntos máximos de las poblaciones para estimar el período
-peaks_x, _ = find_peaks(x_values)
-peaks_y, _ = find_peaks(y_values)
+# Los máximos se detectaron durante la integración; el período promedia todos los ciclos
+maximos_x, maximos_y = maximos
 
-if len(peaks_x) > 1:
-    period_x = (peaks_x[1] - peaks_x[0]) * h
-    print(f"Período aproximado de la población x(t): {period_x:.2f} meses")
+if maximos_x['n'] > 1:
+    period_x = maximos_x['periodo']
+    print(f"Período aproximado de la población x(t): {period_x:.2f} meses ({maximos_x['n']} máximos)")
 else:
     print("No se pudo estimar el período de x(t).")
 
-if len(peaks_y) > 1:
-    period_y = (peaks_y[1] - peaks_y[0]) * h
-    print(f"Período aproximado de la población y(t): {period_y:.2f} meses")
+if maximos_y['n'] > 1:
+    period_y = maximos_y['periodo']
+    print(f"Período aproximado de la población y(t): {period_y:.2f} meses ({maximos_y['n']} máximos)")
 else:
     print("No se pudo estimar el período de y(t).")
@@ -1,44 +1,172 @@
+import os
+import hashlib
 import numpy as np
 import matplotlib.pyplot as plt
 
-def runge_kutta_4_system(f_system, y0, x0, h, n):
+def _derivada_sistema(f_system):
     """
-    Implementación del método de Runge-Kutta de orden 4 para un sistema de EDOs.
+    Adapta f_system a una función F(x, y, out) que escribe las derivadas en out.
     
-    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm]
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :return: Función F(x, y, out)
+    """
+    if callable(f_system):
+        def F(x, y, out):
+            out[...] = f_system(x, y)
+            return out
+    else:
+        def F(x, y, out):
+            for i, f in enumerate(f_system):
+                out[i] = f(x, *y)
+            return out
+    return F
+
+def runge_kutta_4_system(f_system, y0, x0, h, n, stride=1):
+    """
+    Implementación del metodo de Runge-Kutta de orden 4 para un sistema de EDOs.
+    
+    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm],
+                     o una sola función vectorial f(x, y) que devuelve las m derivadas
     :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
     :param x0: Valor inicial de x
     :param h: Tamaño del paso
     :param n: Número de pasos
-    :return: Lista de valores de x y matriz de valores de y
+    :param stride: Guardar solo cada stride pasos (por defecto todos)
+    :return: Arreglo de valores de x, de tamaño n // stride + 1, y matriz de valores
+             de y de forma (n // stride + 1, m)
     """
-    m = len(y0)
-    x_values = [x0]
-    y_values = [y0]
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
     
-    for i in range(n):
-        k1 = np.array([h * f(x0, *y0) for f in f_system])
-        k2 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k1)) for f in f_system])
-        k3 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k2)) for f in f_system])
-        k4 = np.array([h * f(x0 + h, *(y0 + k3)) for f in f_system])
+    # Trayectoria reservada de antemano y llenada en su lugar
+    filas = n // stride + 1
+    x_values = np.empty(filas)
+    y_values = np.empty((filas,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    
+    # Buffers de las etapas, se reservan una sola vez
+    k1 = np.empty_like(y0)
+    k2 = np.empty_like(y0)
+    k3 = np.empty_like(y0)
+    k4 = np.empty_like(y0)
+    y_tmp = np.empty_like(y0)
+    
+    x_inicial = x0
+    for i in range(1, n + 1):
+        F(x0, y0, k1)
+        np.multiply(k1, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k2)
+        np.multiply(k2, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k3)
+        np.multiply(k3, h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + h, y_tmp, k4)
         
-        y0 = y0 + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        x0 = x0 + h
+        # y0 += h * (k1 + 2 * k2 + 2 * k3 + k4) / 6, sin temporales
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        y0 += k2
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
         
-        x_values.append(x0)
-        y_values.append(y0)
+        if i % stride == 0:
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
     
     return x_values, y_values
 
+def runge_kutta_4_ensemble(f_system, Y0, x0, h, n, stride=1):
+    """
+    Integra muchas condiciones iniciales a la vez con Runge-Kutta de orden 4.
+    
+    El estado se avanza como un solo arreglo de forma (m, n_ic), por lo que f_system
+    recibe arreglos con una entrada por condición inicial en lugar de escalares.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :param Y0: Arreglo (n_ic, m) con una condición inicial por fila
+    :param x0: Valor inicial de x
+    :param h: Tamaño del paso
+    :param n: Número de pasos
+    :param stride: Guardar solo cada stride pasos (por defecto todos)
+    :return: Arreglo de valores de x y arreglo de valores de y de forma
+             (n // stride + 1, n_ic, m)
+    """
+    Y0 = np.asarray(Y0, dtype=float)
+    x_values, y_values = runge_kutta_4_system(f_system, Y0.T, x0, h, n, stride)
+    return x_values, y_values.transpose(0, 2, 1)
+
 # Definir las funciones del sistema de EDOs:
 # x'(t) = 0.2 * x - 0.005 * x * y
 # y'(t) = -0.5 * y + 0.01 * x * y
 
-def f1(t, x, y):
-    return 0.2 * x - 0.005 * x * y
+# Coeficientes del modelo (a, b, c, d)
+COEFICIENTES = (0.2, 0.005, 0.5, 0.01)
+
+def dx_dt(x, y, coef=COEFICIENTES):
+    a, b, c, d = coef
+    return a * x - b * x * y
+
+def dy_dt(x, y, coef=COEFICIENTES):
+    a, b, c, d = coef
+    return -c * y + d * x * y
+
+# Caché en disco junto al script, una entrada por modelo (nombre y código), coeficientes y grilla
+DIRECTORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_plano_fase')
+
+def _huella_modelo():
+    """ Huella del código de dx_dt y dy_dt: si se edita una fórmula, la caché no se reutiliza. """
+    codigo = hashlib.sha1()
+    for f in (dx_dt, dy_dt):
+        codigo.update(f.__code__.co_code + repr((f.__code__.co_consts, f.__code__.co_names)).encode())
+    return codigo.hexdigest()
+
+def _ruta_cache(*clave):
+    """ Ruta del archivo de caché para una clave (modelo, coeficientes, grilla, ...). """
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    return os.path.join(DIRECTORIO_CACHE, hashlib.sha1(repr(clave).encode()).hexdigest() + '.npy')
 
-def f2(t, x, y):
-    return -0.5 * y + 0.01 * x * y
+def campo_vectorial(modelo, coef, x_lim, y_lim, resolucion, bloque=256):
+    """
+    Evalúa el campo (dx/dt, dy/dt) en una grilla fina, por bloques de filas.
+    
+    El resultado se escribe directamente en un archivo .npy en disco, de modo que la
+    memoria usada depende de bloque y no de la resolución, y se reutiliza en las
+    siguientes ejecuciones mientras no cambien el modelo, los coeficientes o la grilla.
+    
+    :param modelo: Nombre del modelo (forma parte de la clave de la caché)
+    :param coef: Coeficientes (a, b, c, d)
+    :param x_lim: Tupla (x_min, x_max)
+    :param y_lim: Tupla (y_min, y_max)
+    :param resolucion: Número de puntos por eje
+    :param bloque: Número de filas evaluadas a la vez
+    :return: Arreglo (2, resolucion, resolucion) float32 de solo lectura con U y V
+    """
+    ruta = _ruta_cache('campo', modelo, _huella_modelo(), tuple(coef), tuple(x_lim), tuple(y_lim), resolucion)
+    if not os.path.exists(ruta):
+        x_values = np.linspace(*x_lim, resolucion)
+        y_values = np.linspace(*y_lim, resolucion)
+        temporal = ruta + '.tmp.npy'
+        UV = np.lib.format.open_memmap(temporal, mode='w+', dtype=np.float32,
+                                       shape=(2, resolucion, resolucion))
+        for i in range(0, resolucion, bloque):
+            X, Y = np.meshgrid(x_values, y_values[i:i + bloque])
+            UV[0, i:i + bloque] = dx_dt(X, Y, coef)
+            UV[1, i:i + bloque] = dy_dt(X, Y, coef)
+        UV.flush()
+        del UV
+        os.replace(temporal, ruta)
+    return np.load(ruta, mmap_mode='r')
+
+def f_sistema(t, estado):
+    x, y = estado
+    return np.array([dx_dt(x, y), dy_dt(x, y)])
 
 # Parámetros
 x0_values = [70, 100]  # Valores iniciales de x(t)
@@ -46,23 +174,25 @@ y0_values = [30, 10]   # Valores iniciales de y(t)
 h = 0.1   # Tamaño de paso (1 mes)
 n = int(5 * 12 / h)  # 5 años en pasos de h meses
 
-# Graficar campo vectorial
-X, Y = np.meshgrid(np.linspace(0, 160, 20), np.linspace(0, 160, 20))
-U = 0.2 * X - 0.005 * X * Y
-V = -0.5 * Y + 0.01 * X * Y
+# Graficar campo vectorial (guardado en la caché compartida con Ejercicio2a)
+x_lim = (0, 160)
+y_lim = (0, 160)
+X, Y = np.meshgrid(np.linspace(*x_lim, 20), np.linspace(*y_lim, 20))
+U, V = campo_vectorial('lotka_volterra', COEFICIENTES, x_lim, y_lim, 20)
 
 plt.figure(figsize=(10, 8))
 plt.quiver(X, Y, U, V, color='gray', alpha=0.6)
 
-# Solución para ambas condiciones iniciales
-for i in range(2):
+# Solución para todas las condiciones iniciales en una sola integración
+condiciones_iniciales = np.column_stack((x0_values, y0_values))
+t_values, populations = runge_kutta_4_ensemble(f_sistema, condiciones_iniciales, 0, h, n)
+
+for i in range(len(x0_values)):
     x0 = x0_values[i]
     y0 = y0_values[i]
     
-    t_values, populations = runge_kutta_4_system([f1, f2], [x0, y0], 0, h, n)
-    populations = np.array(populations)
-    x_values = populations[:, 0]
-    y_values = populations[:, 1]
+    x_values = populations[:, i, 0]
+    y_values = populations[:, i, 1]
     
     # Graficar la trayectoria
     plt.plot(x_values, y_values, label=f'Trayectoria (x0={x0}, y0={y0})')
@@ -0,0 +1,265 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+
+def _derivada_sistema(f_system):
+    """
+    Adapta f_system a una función F(x, y, out) que escribe las derivadas en out.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :return: Función F(x, y, out)
+    """
+    if callable(f_system):
+        def F(x, y, out):
+            out[...] = f_system(x, y)
+            return out
+    else:
+        def F(x, y, out):
+            for i, f in enumerate(f_system):
+                out[i] = f(x, *y)
+            return out
+    return F
+
+def runge_kutta_4_system(f_system, y0, x0, h, n, stride=1, al_paso=None):
+    """
+    Implementación del método de Runge-Kutta de orden 4 para un sistema de EDOs.
+    
+    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm],
+                     o una sola función vectorial f(x, y) que devuelve las m derivadas
+    :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
+    :param x0: Valor inicial de x
+    :param h: Tamaño del paso
+    :param n: Número de pasos
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param al_paso: Función opcional al_paso(i, x, y) llamada tras cada paso i, para
+                    reducir la trayectoria sobre la marcha (y es el búfer del estado:
+                    copiarlo si se quiere conservar)
+    :return: Arreglo de valores de x, de tamaño n // stride + 1, y matriz de valores
+             de y de forma (n // stride + 1, m)
+    """
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    
+    # Trayectoria reservada de antemano y llenada en su lugar
+    filas = 1 if stride is None else n // stride + 1
+    x_values = np.empty(filas)
+    y_values = np.empty((filas,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    
+    # Buffers de las etapas, se reservan una sola vez
+    k1 = np.empty_like(y0)
+    k2 = np.empty_like(y0)
+    k3 = np.empty_like(y0)
+    k4 = np.empty_like(y0)
+    y_tmp = np.empty_like(y0)
+    
+    x_inicial = x0
+    for i in range(1, n + 1):
+        F(x0, y0, k1)
+        np.multiply(k1, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k2)
+        np.multiply(k2, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k3)
+        np.multiply(k3, h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + h, y_tmp, k4)
+        
+        # y0 += h * (k1 + 2 * k2 + 2 * k3 + k4) / 6, sin temporales
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        y0 += k2
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
+        if al_paso is not None:
+            al_paso(i, x0, y0)
+        
+        if stride is not None and i % stride == 0:
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
+    
+    if stride is None:
+        x_values[0] = x0
+        y_values[0] = y0
+    
+    return x_values, y_values
+
+def runge_kutta_4_ensemble(f_system, Y0, x0, h, n, stride=1, al_paso=None):
+    """
+    Integra muchas condiciones iniciales a la vez con Runge-Kutta de orden 4.
+    
+    El estado se avanza como un solo arreglo de forma (m, n_ic), por lo que f_system
+    recibe arreglos con una entrada por condición inicial en lugar de escalares.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :param Y0: Arreglo (n_ic, m) con una condición inicial por fila
+    :param x0: Valor inicial de x
+    :param h: Tamaño del paso
+    :param n: Número de pasos
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param al_paso: Función opcional al_paso(i, x, Y) llamada tras cada paso, con Y de
+                    forma (n_ic, m)
+    :return: Arreglo de valores de x y arreglo de valores de y de forma
+             (n // stride + 1, n_ic, m)
+    """
+    Y0 = np.asarray(Y0, dtype=float)
+    if al_paso is not None:
+        al_paso_sistema = lambda i, x, y: al_paso(i, x, y.T)
+    else:
+        al_paso_sistema = None
+    x_values, y_values = runge_kutta_4_system(f_system, Y0.T, x0, h, n, stride, al_paso=al_paso_sistema)
+    return x_values, y_values.transpose(0, 2, 1)
+
+# Modelos con coeficientes variables. coef tiene forma (4, n_ic): una columna por tupla,
+# de modo que cada condición inicial del ensamble usa sus propios coeficientes.
+# Lotka-Volterra: x' = a * x - b * x * y,          y' = -c * y + d * x * y
+# Competencia:    x' = a * x - b * x**2 - x * y,   y' = -c * y + d * x * y
+
+def f_lotka_volterra(t, estado, coef):
+    x, y = estado
+    a, b, c, d = coef
+    return np.array([a * x - b * x * y,
+                     -c * y + d * x * y])
+
+def f_competencia(t, estado, coef):
+    x, y = estado
+    a, b, c, d = coef
+    return np.array([a * x - b * x**2 - x * y,
+                     -c * y + d * x * y])
+
+# Columnas de la tabla de resultados
+CAMPOS = [('a', 'f8'), ('b', 'f8'), ('c', 'f8'), ('d', 'f8'),
+          ('periodo_x', 'f8'), ('periodo_y', 'f8'),
+          ('amplitud_x', 'f8'), ('amplitud_y', 'f8'),
+          ('x_final', 'f8'), ('y_final', 'f8')]
+
+class ReduccionSeries:
+    """
+    Resume varias series muestra a muestra, sin guardarlas: mínimo, máximo y máximos
+    locales (una muestra mayor que la anterior y no menor que la siguiente).
+    """
+    def __init__(self, valores):
+        """
+        :param valores: Arreglo (k,) con la primera muestra de cada serie
+        """
+        self.minimo = valores.copy()
+        self.maximo = valores.copy()
+        self.anterior = np.full_like(valores, np.nan)  # Muestra j - 2
+        self.actual = valores.copy()                    # Muestra j - 1
+        self.j = 0
+        self.cantidad = np.zeros(valores.shape, dtype=int)
+        self.primero = np.zeros(valores.shape, dtype=int)
+        self.ultimo = np.zeros(valores.shape, dtype=int)
+    
+    def agregar(self, valores):
+        """ Incorpora la muestra siguiente de cada serie. """
+        self.j += 1
+        np.minimum(self.minimo, valores, out=self.minimo)
+        np.maximum(self.maximo, valores, out=self.maximo)
+        # La muestra anterior (índice j - 1) es un máximo local (nan nunca compara True)
+        maximo = (self.actual > self.anterior) & (self.actual >= valores)
+        self.primero[maximo & (self.cantidad == 0)] = self.j - 1
+        self.ultimo[maximo] = self.j - 1
+        self.cantidad += maximo
+        self.anterior, self.actual = self.actual, valores.copy()
+    
+    def periodo(self, dt):
+        """ Período medio entre máximos (nan si hay menos de dos máximos). """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.cantidad > 1, (self.ultimo - self.primero) * dt / (self.cantidad - 1), np.nan)
+
+def _integrar_bloque(args):
+    """
+    Integra un bloque de tuplas de coeficientes como un solo ensamble y resume cada una
+    sobre la marcha (con al_paso), sin guardar las trayectorias.
+    """
+    f_modelo, coeficientes, y0, h, n, stride = args
+    coef = coeficientes.T
+    Y0 = np.tile(np.asarray(y0, dtype=float), (len(coeficientes), 1))
+    x, y = ReduccionSeries(Y0[:, 0]), ReduccionSeries(Y0[:, 1])
+    
+    def al_paso(i, t, poblaciones):
+        if i % stride == 0:
+            x.agregar(poblaciones[:, 0])
+            y.agregar(poblaciones[:, 1])
+    
+    _, final = runge_kutta_4_ensemble(lambda t, estado: f_modelo(t, estado, coef),
+                                      Y0, 0, h, n, stride=None, al_paso=al_paso)
+    
+    tabla = np.empty(len(coeficientes), dtype=CAMPOS)
+    for i, nombre in enumerate('abcd'):
+        tabla[nombre] = coeficientes[:, i]
+    tabla['periodo_x'] = x.periodo(h * stride)
+    tabla['periodo_y'] = y.periodo(h * stride)
+    tabla['amplitud_x'] = x.maximo - x.minimo
+    tabla['amplitud_y'] = y.maximo - y.minimo
+    tabla['x_final'] = final[-1, :, 0]
+    tabla['y_final'] = final[-1, :, 1]
+    return tabla
+
+def barrido_parametros(f_modelo, coeficientes, y0, h, n, stride=1, procesos=None, bloque=500):
+    """
+    Barrido de parámetros: integra muchas tuplas de coeficientes y resume cada trayectoria.
+    
+    Las tuplas se agrupan en bloques; cada bloque se integra como un ensamble vectorizado
+    con runge_kutta_4_ensemble (sin guardar trayectorias: las métricas se calculan
+    sobre la marcha con al_paso) y los bloques
+    se reparten entre procesos.
+    
+    :param f_modelo: Función f(t, estado, coef) definida a nivel de módulo
+    :param coeficientes: Arreglo (n_tuplas, 4) con los coeficientes (a, b, c, d)
+    :param y0: Condición inicial [x0, y0] común a todas las tuplas
+    :param h: Tamaño del paso
+    :param n: Número de pasos
+    :param stride: Usar solo cada stride pasos para las métricas
+    :param procesos: Número de procesos (por defecto todos los núcleos)
+    :param bloque: Número de tuplas por bloque
+    :return: Tabla (arreglo estructurado) con una fila por tupla y las columnas de CAMPOS
+    """
+    coeficientes = np.asarray(coeficientes, dtype=float)
+    bloques = [(f_modelo, coeficientes[i:i + bloque], y0, h, n, stride)
+               for i in range(0, len(coeficientes), bloque)]
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as ejecutor:
+        return np.concatenate(list(ejecutor.map(_integrar_bloque, bloques)))
+
+if __name__ == "__main__":
+    # Parámetros
+    h = 0.1  # Tamaño de paso (1 mes)
+    n = int(10 * 12 / h)  # 10 años en pasos de h meses
+    
+    # Grilla de coeficientes alrededor de los del ejercicio 2 (0.2, 0.005, 0.5, 0.01)
+    a_values = np.linspace(0.1, 0.4, 50)
+    c_values = np.linspace(0.25, 0.75, 50)
+    A, C = np.meshgrid(a_values, c_values)
+    coeficientes = np.column_stack((A.ravel(), np.full(A.size, 0.005), C.ravel(), np.full(A.size, 0.01)))
+    
+    tabla = barrido_parametros(f_lotka_volterra, coeficientes, [70, 30], h, n)
+    print(f"Tuplas integradas: {len(tabla)}")
+    print(f"Período de x(t): entre {np.nanmin(tabla['periodo_x']):.2f} y {np.nanmax(tabla['periodo_x']):.2f} meses")
+    
+    # Modelo de competencia alrededor de (0.5, 0.001, 0.2, 0.1)
+    b_values = np.linspace(0.0005, 0.002, 40)
+    d_values = np.linspace(0.05, 0.15, 40)
+    B, D = np.meshgrid(b_values, d_values)
+    coef_competencia = np.column_stack((np.full(B.size, 0.5), B.ravel(), np.full(B.size, 0.2), D.ravel()))
+    tabla_competencia = barrido_parametros(f_competencia, coef_competencia, [10, 10], h, n)
+    print(f"Competencia: población final media de x = {tabla_competencia['x_final'].mean():.2f}, "
+          f"de y = {tabla_competencia['y_final'].mean():.2f}")
+    
+    # Mapa del período de x(t) en el plano (a, c)
+    plt.figure(figsize=(8, 6))
+    plt.pcolormesh(A, C, tabla['periodo_x'].reshape(A.shape), shading='auto')
+    plt.colorbar(label='Período de x(t) (meses)')
+    plt.xlabel('a (crecimiento de x)')
+    plt.ylabel('c (mortalidad de y)')
+    plt.title('Período del ciclo depredador-presa según los coeficientes')
+    plt.show()
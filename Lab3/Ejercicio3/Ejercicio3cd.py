@@ -1,44 +1,242 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-def runge_kutta_4_system(f_system, y0, x0, h, n):
+def _derivada_sistema(f_system):
     """
-    Implementación del método de Runge-Kutta de orden 4 para un sistema de EDOs.
+    Adapta f_system a una función F(x, y, out) que escribe las derivadas en out.
     
-    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm]
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :return: Función F(x, y, out)
+    """
+    if callable(f_system):
+        def F(x, y, out):
+            out[...] = f_system(x, y)
+            return out
+    else:
+        def F(x, y, out):
+            for i, f in enumerate(f_system):
+                out[i] = f(x, *y)
+            return out
+    return F
+
+def runge_kutta_4_system(f_system, y0, x0, h, n, stride=1, eventos=None, al_evento=None):
+    """
+    Implementación del metodo de Runge-Kutta de orden 4 para un sistema de EDOs.
+    
+    Los eventos son funciones g(x, y) cuyos cruces por cero se localizan durante la
+    integración (interpolando linealmente g entre pasos), sin guardar la trayectoria.
+    Por ejemplo, los máximos de y1 son los cruces de dy1/dx de positivo a negativo.
+    
+    :param f_system: Lista de funciones que definen el sistema de EDOs [f1, f2, ..., fm],
+                     o una sola función vectorial f(x, y) que devuelve las m derivadas
     :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
     :param x0: Valor inicial de x
     :param h: Tamaño del paso
     :param n: Número de pasos
-    :return: Lista de valores de x y matriz de valores de y
+    :param stride: Guardar solo cada stride pasos (por defecto todos); si es None solo
+                   se guarda el estado final
+    :param eventos: Lista de tuplas (g, direccion); direccion = -1 detecta cruces de
+                    positivo a negativo, 1 de negativo a positivo y 0 ambos
+    :param al_evento: Función opcional al_evento(indice, x, y) llamada en cada evento
+    :return: Arreglo de valores de x, de tamaño n // stride + 1, y matriz de valores
+             de y de forma (n // stride + 1, m). Si hay eventos se devuelve además una
+             lista con un diccionario por evento con 'n', 't_primero', 't_ultimo' y
+             'periodo' (separación media entre eventos consecutivos)
     """
-    m = len(y0)
-    x_values = [x0]
-    y_values = [y0]
-    
-    for i in range(n):
-        k1 = np.array([h * f(x0, *y0) for f in f_system])
-        k2 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k1)) for f in f_system])
-        k3 = np.array([h * f(x0 + 0.5 * h, *(y0 + 0.5 * k2)) for f in f_system])
-        k4 = np.array([h * f(x0 + h, *(y0 + k3)) for f in f_system])
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    
+    # Trayectoria reservada de antemano y llenada en su lugar
+    filas = 1 if stride is None else n // stride + 1
+    x_values = np.empty(filas)
+    y_values = np.empty((filas,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    
+    # Estado de los eventos: solo contadores, memoria constante
+    if eventos is not None:
+        g_anterior = [g(x0, y0) for g, _ in eventos]
+        info_eventos = [{'n': 0, 't_primero': np.nan, 't_ultimo': np.nan} for _ in eventos]
+    
+    # Buffers de las etapas, se reservan una sola vez
+    k1 = np.empty_like(y0)
+    k2 = np.empty_like(y0)
+    k3 = np.empty_like(y0)
+    k4 = np.empty_like(y0)
+    y_tmp = np.empty_like(y0)
+    
+    x_inicial = x0
+    for i in range(1, n + 1):
+        F(x0, y0, k1)
+        np.multiply(k1, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k2)
+        np.multiply(k2, 0.5 * h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + 0.5 * h, y_tmp, k3)
+        np.multiply(k3, h, out=y_tmp)
+        y_tmp += y0
+        F(x0 + h, y_tmp, k4)
+        
+        # y0 += h * (k1 + 2 * k2 + 2 * k3 + k4) / 6, sin temporales
+        k2 += k3
+        k2 *= 2
+        k2 += k1
+        k2 += k4
+        k2 *= h / 6
+        y0 += k2
+        x_anterior = x0
+        x0 = x_inicial + i * h  # Sin acumular h: cada x tiene un solo redondeo
         
-        y0 = y0 + (k1 + 2 * k2 + 2 * k3 + k4) / 6
-        x0 = x0 + h
+        if stride is not None and i % stride == 0:
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
         
-        x_values.append(x0)
-        y_values.append(y0)
+        if eventos is not None:
+            for e, (g, direccion) in enumerate(eventos):
+                g_prev = g_anterior[e]
+                g_nuevo = g(x0, y0)
+                if ((direccion <= 0 and g_prev > 0 and g_nuevo <= 0) or
+                        (direccion >= 0 and g_prev < 0 and g_nuevo >= 0)):
+                    x_evento = x_anterior + h * g_prev / (g_prev - g_nuevo)
+                    info = info_eventos[e]
+                    if info['n'] == 0:
+                        info['t_primero'] = x_evento
+                    info['n'] += 1
+                    info['t_ultimo'] = x_evento
+                    if al_evento is not None:
+                        al_evento(e, x_evento, y0)
+                g_anterior[e] = g_nuevo
+    
+    if stride is None:
+        x_values[0] = x0
+        y_values[0] = y0
+    
+    if eventos is not None:
+        for info in info_eventos:
+            info['periodo'] = (info['t_ultimo'] - info['t_primero']) / (info['n'] - 1) if info['n'] > 1 else np.nan
+        return x_values, y_values, info_eventos
     
     return x_values, y_values
 
+# Coeficientes de Dormand-Prince 5(4)
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DP_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+    [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+]
+# Diferencia entre la solución de orden 5 y la de orden 4 (estimador del error)
+_DP_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+def runge_kutta_45_system(f_system, y0, x0, x_final, rtol=1e-6, atol=1e-9, h0=None, max_pasos=1000000):
+    """
+    Método adaptativo de Runge-Kutta de Dormand-Prince 5(4) para un sistema de EDOs.
+    
+    El tamaño del paso se ajusta para que el error local estimado quede por debajo de
+    atol + rtol * |y|; los pasos que no cumplen la tolerancia se rechazan y se repiten.
+    
+    :param f_system: Lista de funciones [f1, f2, ..., fm] o una función vectorial f(x, y)
+    :param y0: Lista con los valores iniciales de [y1, y2, ..., ym]
+    :param x0: Valor inicial de x
+    :param x_final: Valor final de x
+    :param rtol: Tolerancia relativa
+    :param atol: Tolerancia absoluta
+    :param h0: Tamaño del primer paso (si es None se estima automáticamente)
+    :param max_pasos: Número máximo de pasos aceptados
+    :return: Arreglo de valores de x, matriz de valores de y y diccionario con las
+             estadísticas 'pasos_aceptados', 'pasos_rechazados' y 'evaluaciones'
+    """
+    F = _derivada_sistema(f_system)
+    y0 = np.array(y0, dtype=float)
+    estadisticas = {'pasos_aceptados': 0, 'pasos_rechazados': 0, 'evaluaciones': 0}
+    
+    # Trayectoria en un arreglo que se duplica cuando se llena
+    capacidad = 64
+    x_values = np.empty(capacidad)
+    y_values = np.empty((capacidad,) + y0.shape)
+    x_values[0] = x0
+    y_values[0] = y0
+    fila = 1
+    
+    K = np.empty((7,) + y0.shape)
+    y_tmp = np.empty_like(y0)
+    y_nuevo = np.empty_like(y0)
+    error = np.empty_like(y0)
+    F(x0, y0, K[0])
+    estadisticas['evaluaciones'] += 1
+    
+    if h0 is None:
+        # Estimación del primer paso (Hairer, Nørsett y Wanner)
+        escala = atol + rtol * np.abs(y0)
+        d0 = np.sqrt(np.mean((y0 / escala) ** 2))
+        d1 = np.sqrt(np.mean((K[0] / escala) ** 2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        h0 = min(h0, x_final - x0)
+    h = h0
+    
+    while x0 < x_final:
+        if estadisticas['pasos_aceptados'] >= max_pasos:
+            raise RuntimeError(f"Se alcanzó el máximo de {max_pasos} pasos en x = {x0}")
+        h = min(h, x_final - x0)
+        
+        for s in range(1, 7):
+            y_tmp[...] = y0
+            for j, a in enumerate(_DP_A[s]):
+                if a != 0:
+                    y_tmp += (h * a) * K[j]
+            F(x0 + _DP_C[s] * h, y_tmp, K[s])
+        estadisticas['evaluaciones'] += 6
+        # La última etapa se evalúa en la solución de orden 5 (FSAL)
+        y_nuevo[...] = y_tmp
+        
+        error[...] = np.tensordot(h * _DP_E, K, axes=1)
+        escala = atol + rtol * np.maximum(np.abs(y0), np.abs(y_nuevo))
+        norma = np.sqrt(np.mean((error / escala) ** 2))
+        
+        if norma <= 1:
+            x0 = x0 + h
+            y0[...] = y_nuevo
+            K[0] = K[6]
+            estadisticas['pasos_aceptados'] += 1
+            
+            if fila == capacidad:
+                capacidad *= 2
+                x_values = np.resize(x_values, capacidad)
+                y_values = np.resize(y_values, (capacidad,) + y0.shape)
+            x_values[fila] = x0
+            y_values[fila] = y0
+            fila += 1
+            
+            factor = 5.0 if norma == 0 else min(5.0, 0.9 * norma ** -0.2)
+        else:
+            estadisticas['pasos_rechazados'] += 1
+            factor = max(0.2, 0.9 * norma ** -0.2)
+        h = h * factor
+    
+    return x_values[:fila], y_values[:fila], estadisticas
+
 # Definir las funciones del sistema de EDOs:
 # x'(t) = 0.2 * x - 0.005 * x * y
 # y'(t) = -0.5 * y + 0.01 * x * y
 
-def f1(t, x, y):
-    return 0.5 * x - 0.001 * x**2 - x * y
+def f_sistema(t, estado):
+    x, y = estado
+    return np.array([0.5 * x - 0.001 * x**2 - x * y,
+                     -0.2 * y + 0.1 * x * y])
 
-def f2(t, x, y):
-    return -0.2 * y + 0.1 * x * y
+# Eventos: los máximos de x(t) e y(t) son los cruces de dx/dt y dy/dt de positivo a negativo
+def dx_dt(t, estado):
+    return f_sistema(t, estado)[0]
+
+def dy_dt(t, estado):
+    return f_sistema(t, estado)[1]
 
 # Parámetros
 x0 = 10  # Valor inicial de x(t)
@@ -47,8 +245,8 @@ h = 0.1  # Tamaño de paso (1 mes)
 n = int(5 * 12 / h)  # 5 años en pasos de h meses
 
 # Solución
-t_values, populations = runge_kutta_4_system([f1, f2], [x0, y0], 0, h, n)
-populations = np.array(populations)
+t_values, populations, maximos = runge_kutta_4_system(f_sistema, [x0, y0], 0, h, n,
+                                                       eventos=[(dx_dt, -1), (dy_dt, -1)])
 x_values = populations[:, 0]
 y_values = populations[:, 1]
 
@@ -67,21 +265,25 @@ plt.show()
 print(f"Población de x después de 5 años: {x_values[-1]:.2f}")
 print(f"Población de y después de 5 años: {y_values[-1]:.2f}")
 
-# Estimar el período o ciclo de repetición
-# Identificar puntos máximos de las poblaciones para estimar el período
-from scipy.signal import find_peaks
+# Solución adaptativa (Dormand-Prince) con control del error: el número de pasos se mide
+t_adapt, pob_adapt, estadisticas = runge_kutta_45_system(f_sistema, [x0, y0], 0, n * h, rtol=1e-8, atol=1e-10)
+print(f"RK45 adaptativo: {estadisticas['pasos_aceptados']} pasos aceptados, "
+      f"{estadisticas['pasos_rechazados']} rechazados, {estadisticas['evaluaciones']} evaluaciones "
+      f"(RK4 con paso fijo: {n} pasos, {4 * n} evaluaciones)")
+print(f"RK45 adaptativo después de 5 años: x = {pob_adapt[-1, 0]:.2e}, y = {pob_adapt[-1, 1]:.2e}")
 
-peaks_x, _ = find_peaks(x_values)
-peaks_y, _ = find_peaks(y_values)
+# Estimar el período o ciclo de repetición
+# Los máximos se detectaron durante la integración; el período promedia todos los ciclos
+maximos_x, maximos_y = maximos
 
-if len(peaks_x) > 1:
-    period_x = (peaks_x[1] - peaks_x[0]) * h
-    print(f"Período aproximado de la población x(t): {period_x:.2f} meses")
+if maximos_x['n'] > 1:
+    period_x = maximos_x['periodo']
+    print(f"Período aproximado de la población x(t): {period_x:.2f} meses ({maximos_x['n']} máximos)")
 else:
     print("No se pudo estimar el período de x(t).")
 
-if len(peaks_y) > 1:
-    period_y = (peaks_y[1] - peaks_y[0]) * h
-    print(f"Período aproximado de la población y(t): {period_y:.2f} meses")
+if maximos_y['n'] > 1:
+    period_y = maximos_y['periodo']
+    print(f"Período aproximado de la población y(t): {period_y:.2f} meses ({maximos_y['n']} máximos)")
 else:
     print("No se pudo estimar el período de y(t).")
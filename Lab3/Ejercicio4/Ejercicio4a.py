@@ -1,5 +1,5 @@
+import warnings
 import numpy as np
-from scipy.integrate import odeint
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D 
 
@@ -8,24 +8,113 @@ p0 = np.array([0.325514, -0.459460, 0.166229])  # Posición inicial en UA
 v0 = np.array([-9.096111, -6.916686, -1.305721])  # Velocidad inicial en UA/año
 mu = 4 * np.pi**2  # Constante gravitacional
 
-# Definimos el sistema de ecuaciones diferenciales de segundo orden
-def sistema_ecuaciones(w, t):
-    x, y, z, vx, vy, vz = w
-    r = np.sqrt(x**2 + y**2 + z**2)
-    d2x_dt2 = -mu * x / r**3
-    d2y_dt2 = -mu * y / r**3
-    d2z_dt2 = -mu * z / r**3
-    return vx, vy, vz, d2x_dt2, d2y_dt2, d2z_dt2
+# Problema de dos cuerpos: r'' = -mu * r / |r|^3, resuelto analíticamente
+def stumpff_c(z):
+    """
+    Stumpff function C(z) used by the universal-variable Kepler solver.
+    """
+    z = np.asarray(z, dtype=float)
+    raiz = np.sqrt(np.abs(z))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(z > 1e-8, (1 - np.cos(raiz)) / z,
+               np.where(z < -1e-8, (np.cosh(raiz) - 1) / -z,
+                        0.5 - z / 24))
 
-# Condiciones iniciales para odeint (combinamos posición y velocidad)
-w0 = np.concatenate((p0, v0))
+def stumpff_s(z):
+    """
+    Stumpff function S(z) used by the universal-variable Kepler solver.
+    """
+    z = np.asarray(z, dtype=float)
+    raiz = np.sqrt(np.abs(z))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(z > 1e-8, (raiz - np.sin(raiz)) / raiz**3,
+               np.where(z < -1e-8, (np.sinh(raiz) - raiz) / raiz**3,
+                        1 / 6 - z / 120))
 
-# Intervalo de tiempo para la integración (en años)
+def kepler_propagate_batch(p0, v0, epochs, mu, tol=1e-12, max_iter=50):
+    """
+    Propagates many two-body states to many epochs at once (universal variables).
+
+    The universal anomaly is found with Newton's method for every (state, epoch) pair
+    in a single array iteration, and the state follows from the Lagrange f and g
+    coefficients, so jumping to any epoch costs the same and energy does not drift.
+    Quantities that depend only on the initial state (r0, vr0, alpha, period) are
+    computed once per state. For elliptic orbits whole periods are removed from t first.
+    Elliptic, parabolic and hyperbolic states are all supported; each kind gets its own
+    starting guess. A RuntimeWarning is issued if some pair has not converged after
+    max_iter iterations.
+
+    Args:
+        p0: Initial positions, array of shape (n_states, 3).
+        v0: Initial velocities, array of shape (n_states, 3).
+        epochs: Times since the initial epoch, array of shape (n_epochs,).
+        mu: Gravitational parameter.
+        tol: Tolerance on the universal anomaly.
+        max_iter: Maximum number of Newton iterations.
+
+    Returns:
+        Array of shape (n_states, n_epochs, 6) with position and velocity components.
+    """
+    p0 = np.atleast_2d(np.asarray(p0, dtype=float))
+    v0 = np.atleast_2d(np.asarray(v0, dtype=float))
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+
+    # Per-state quantities, shaped (n_states, 1) to broadcast against the epochs
+    r0 = np.linalg.norm(p0, axis=1)[:, None]
+    vr0 = np.sum(p0 * v0, axis=1)[:, None] / r0
+    alpha = 2 / r0 - np.sum(v0 * v0, axis=1)[:, None] / mu  # Inverse of the semi-major axis
+    sqrt_mu = np.sqrt(mu)
+
+    t = np.broadcast_to(epochs, (len(p0), len(epochs)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = np.where(alpha > 0, 2 * np.pi / np.sqrt(mu * np.abs(alpha)**3), np.inf)
+    t = np.where(alpha > 0, np.fmod(t, period), t)
+
+    # Starting guesses (Vallado): sqrt(mu)*alpha*t for ellipses, a logarithmic guess for
+    # hyperbolas (a linear one would overflow cosh) and sqrt(mu)*t/r0 near parabolas
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        a = 1 / alpha
+        sign = np.sign(t)
+        chi_hyperbolic = sign * np.sqrt(-a) * np.log(
+            -2 * mu * alpha * t / (r0 * vr0 + sign * np.sqrt(-mu * a) * (1 - r0 * alpha)))
+    chi = np.where(alpha > 1e-10, sqrt_mu * alpha * t,
+          np.where(alpha < -1e-10, chi_hyperbolic, sqrt_mu * t / r0))
+    chi = np.where(np.isfinite(chi), chi, sqrt_mu * t / r0)
+
+    # Newton iteration on the universal Kepler equation for all pairs at once
+    for _ in range(max_iter):
+        z = alpha * chi**2
+        C, S = stumpff_c(z), stumpff_s(z)
+        F = r0 * vr0 / sqrt_mu * chi**2 * C + (1 - alpha * r0) * chi**3 * S + r0 * chi - sqrt_mu * t
+        dF = r0 * vr0 / sqrt_mu * chi * (1 - z * S) + (1 - alpha * r0) * chi**2 * C + r0
+        delta = F / dF
+        chi = chi - delta
+        converged = np.abs(delta) < tol * np.maximum(1.0, np.abs(chi))
+        if np.all(converged):
+            break
+    else:
+        warnings.warn(f"Kepler solver did not converge for {np.count_nonzero(~converged)} of "
+                      f"{converged.size} (state, epoch) pairs after {max_iter} iterations",
+                      RuntimeWarning, stacklevel=2)
+
+    z = alpha * chi**2
+    C, S = stumpff_c(z), stumpff_s(z)
+    f = (1 - chi**2 / r0 * C)[..., None]
+    g = (t - chi**3 / sqrt_mu * S)[..., None]
+    p = f * p0[:, None, :] + g * v0[:, None, :]
+    r = np.linalg.norm(p, axis=2)
+    fdot = (sqrt_mu / (r * r0) * (alpha * chi**3 * S - chi))[..., None]
+    gdot = (1 - chi**2 / r * C)[..., None]
+    v = fdot * p0[:, None, :] + gdot * v0[:, None, :]
+    return np.concatenate((p, v), axis=2)
+
+# Intervalo de tiempo (en años)
 # Ajusta el valor final para simular más o menos tiempo
 t_span = np.linspace(0, 76, 1000)  # Simulamos un periodo orbital completo (aprox. 76 años)
 
-# Resolvemos el sistema de ecuaciones diferenciales
-sol = odeint(sistema_ecuaciones, w0, t_span)
+# Todos los instantes en una sola llamada: cada uno se calcula directamente desde el
+# estado inicial, sin acumular error de integración
+sol = kepler_propagate_batch(p0, v0, t_span, mu)[0]
 
 # Extraemos las componentes de posición de la solución
 x, y, z = sol[:, 0], sol[:, 1], sol[:, 2]
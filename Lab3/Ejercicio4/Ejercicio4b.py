@@ -1,3 +1,4 @@
+import warnings
 import numpy as np
 from scipy.integrate import odeint
 
@@ -23,6 +24,121 @@ def comet_motion(w, t, mu):
     dvzdt = -mu * z / r**3
     return [dxdt, dydt, dzdt, dvxdt, dvydt, dvzdt]
 
+def stumpff_c(z):
+    """
+    Stumpff function C(z) used by the universal-variable Kepler solver.
+    """
+    z = np.asarray(z, dtype=float)
+    raiz = np.sqrt(np.abs(z))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(z > 1e-8, (1 - np.cos(raiz)) / z,
+               np.where(z < -1e-8, (np.cosh(raiz) - 1) / -z,
+                        0.5 - z / 24))
+
+def stumpff_s(z):
+    """
+    Stumpff function S(z) used by the universal-variable Kepler solver.
+    """
+    z = np.asarray(z, dtype=float)
+    raiz = np.sqrt(np.abs(z))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(z > 1e-8, (raiz - np.sin(raiz)) / raiz**3,
+               np.where(z < -1e-8, (np.sinh(raiz) - raiz) / raiz**3,
+                        1 / 6 - z / 120))
+
+def kepler_propagate_batch(p0, v0, epochs, mu, tol=1e-12, max_iter=50):
+    """
+    Propagates many two-body states to many epochs at once (universal variables).
+
+    The universal anomaly is found with Newton's method for every (state, epoch) pair
+    in a single array iteration, and the state follows from the Lagrange f and g
+    coefficients, so jumping to any epoch costs the same and energy does not drift.
+    Quantities that depend only on the initial state (r0, vr0, alpha, period) are
+    computed once per state. For elliptic orbits whole periods are removed from t first.
+    Elliptic, parabolic and hyperbolic states are all supported; each kind gets its own
+    starting guess. A RuntimeWarning is issued if some pair has not converged after
+    max_iter iterations.
+
+    Args:
+        p0: Initial positions, array of shape (n_states, 3).
+        v0: Initial velocities, array of shape (n_states, 3).
+        epochs: Times since the initial epoch, array of shape (n_epochs,).
+        mu: Gravitational parameter.
+        tol: Tolerance on the universal anomaly.
+        max_iter: Maximum number of Newton iterations.
+
+    Returns:
+        Array of shape (n_states, n_epochs, 6) with position and velocity components.
+    """
+    p0 = np.atleast_2d(np.asarray(p0, dtype=float))
+    v0 = np.atleast_2d(np.asarray(v0, dtype=float))
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+
+    # Per-state quantities, shaped (n_states, 1) to broadcast against the epochs
+    r0 = np.linalg.norm(p0, axis=1)[:, None]
+    vr0 = np.sum(p0 * v0, axis=1)[:, None] / r0
+    alpha = 2 / r0 - np.sum(v0 * v0, axis=1)[:, None] / mu  # Inverse of the semi-major axis
+    sqrt_mu = np.sqrt(mu)
+
+    t = np.broadcast_to(epochs, (len(p0), len(epochs)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = np.where(alpha > 0, 2 * np.pi / np.sqrt(mu * np.abs(alpha)**3), np.inf)
+    t = np.where(alpha > 0, np.fmod(t, period), t)
+
+    # Starting guesses (Vallado): sqrt(mu)*alpha*t for ellipses, a logarithmic guess for
+    # hyperbolas (a linear one would overflow cosh) and sqrt(mu)*t/r0 near parabolas
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        a = 1 / alpha
+        sign = np.sign(t)
+        chi_hyperbolic = sign * np.sqrt(-a) * np.log(
+            -2 * mu * alpha * t / (r0 * vr0 + sign * np.sqrt(-mu * a) * (1 - r0 * alpha)))
+    chi = np.where(alpha > 1e-10, sqrt_mu * alpha * t,
+          np.where(alpha < -1e-10, chi_hyperbolic, sqrt_mu * t / r0))
+    chi = np.where(np.isfinite(chi), chi, sqrt_mu * t / r0)
+
+    # Newton iteration on the universal Kepler equation for all pairs at once
+    for _ in range(max_iter):
+        z = alpha * chi**2
+        C, S = stumpff_c(z), stumpff_s(z)
+        F = r0 * vr0 / sqrt_mu * chi**2 * C + (1 - alpha * r0) * chi**3 * S + r0 * chi - sqrt_mu * t
+        dF = r0 * vr0 / sqrt_mu * chi * (1 - z * S) + (1 - alpha * r0) * chi**2 * C + r0
+        delta = F / dF
+        chi = chi - delta
+        converged = np.abs(delta) < tol * np.maximum(1.0, np.abs(chi))
+        if np.all(converged):
+            break
+    else:
+        warnings.warn(f"Kepler solver did not converge for {np.count_nonzero(~converged)} of "
+                      f"{converged.size} (state, epoch) pairs after {max_iter} iterations",
+                      RuntimeWarning, stacklevel=2)
+
+    z = alpha * chi**2
+    C, S = stumpff_c(z), stumpff_s(z)
+    f = (1 - chi**2 / r0 * C)[..., None]
+    g = (t - chi**3 / sqrt_mu * S)[..., None]
+    p = f * p0[:, None, :] + g * v0[:, None, :]
+    r = np.linalg.norm(p, axis=2)
+    fdot = (sqrt_mu / (r * r0) * (alpha * chi**3 * S - chi))[..., None]
+    gdot = (1 - chi**2 / r * C)[..., None]
+    v = fdot * p0[:, None, :] + gdot * v0[:, None, :]
+    return np.concatenate((p, v), axis=2)
+
+def kepler_propagate(p0, v0, t, mu):
+    """
+    Propagates a single two-body state to time t (see kepler_propagate_batch).
+
+    Args:
+        p0: Initial position (x, y, z).
+        v0: Initial velocity (vx, vy, vz).
+        t: Time since the initial epoch.
+        mu: Gravitational parameter.
+
+    Returns:
+        Position and velocity arrays at time t.
+    """
+    w = kepler_propagate_batch(p0, v0, [t], mu)[0, 0]
+    return w[:3], w[3:]
+
 # Initial conditions from 1986
 p0 = np.array([0.325514, -0.459460, 0.166229])  # Position in AU
 v0 = np.array([-9.096111, -6.916686, -1.305721])  # Velocity in AU/year
@@ -34,14 +150,9 @@ t_span = np.array([100, 200])  # For 2086 and 2186
 # Initial state vector
 w0 = np.concatenate((p0, v0))
 
-# Solve the differential equations using odeint
-sol = odeint(comet_motion, w0, t_span, args=(mu,))
-
-# Extract position and velocity at the desired times
-p_2086 = sol[0, :3]
-v_2086 = sol[0, 3:]
-p_2186 = sol[1, :3]
-v_2186 = sol[1, 3:]
+# Jump straight to each epoch with the analytic Kepler propagator
+p_2086, v_2086 = kepler_propagate(p0, v0, t_span[0], mu)
+p_2186, v_2186 = kepler_propagate(p0, v0, t_span[1], mu)
 
 # Print the results
 print("Estimated position and velocity for 9th February 2086:")
@@ -50,4 +161,21 @@ print("Velocity (AU/year):", v_2086)
 
 print("\nEstimated position and velocity for 9th February 2186:")
 print("Position (AU):", p_2186)
-print("Velocity (AU/year):", v_2186)
\ No newline at end of file
+print("Velocity (AU/year):", v_2186)
+
+# Reference: numerical integration of the same equations with odeint
+sol = odeint(comet_motion, w0, np.concatenate(([0], t_span)), args=(mu,))
+print("\nDifference with odeint (AU):", np.linalg.norm(sol[1:, :3] - np.array([p_2086, p_2186]), axis=1))
+
+# Monte Carlo cloud of perturbed initial states (observation uncertainty) over many epochs
+rng = np.random.default_rng(1986)
+n_samples = 1000
+p0_samples = p0 + rng.normal(scale=1e-6, size=(n_samples, 3))
+v0_samples = v0 + rng.normal(scale=1e-5, size=(n_samples, 3))
+epochs = np.linspace(0, 200, 2001)
+states = kepler_propagate_batch(p0_samples, v0_samples, epochs, mu)  # (n_samples, n_epochs, 6)
+
+for year in [100, 200]:
+    k = np.searchsorted(epochs, year)
+    spread = np.std(states[:, k, :3], axis=0)
+    print(f"Position spread in {1986 + year} over {n_samples} samples (AU):", spread)
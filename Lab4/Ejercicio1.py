@@ -1,7 +1,15 @@
+import queue
+import threading
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
+try:
+    import imageio.v2 as imageio  # Opcional: solo para exportar video
+except ImportError:
+    imageio = None
+
 # Parámetros (ajustados según la imagen)
 N, M = 50, 50  # Tamaño de la grilla
 beta = 0.1     # Probabilidad de contagio
@@ -9,45 +17,211 @@ gamma = 0.25   # Probabilidad de recuperación
 r = 1          # Radio de interacción
 tiempo_total = 100
 I0 = 2         # Número inicial de infectados
+motor = 'frontera'  # 'frontera' (solo vecindades de los infectados) o 'grilla' (toda la grilla)
+
+# Modo de ejecución: 'ventana' anima con FuncAnimation; 'sin_ventana' simula a toda
+# velocidad y un hilo aparte escribe los fotogramas (sirve en servidores sin pantalla)
+modo = 'ventana'
+salida = 'fotogramas_sir'  # Prefijo de los archivos generados en modo 'sin_ventana'
+formato = 'npz'            # 'npz' (bloques comprimidos), 'video' (requiere imageio) o None (sin fotogramas)
+fotogramas_por_bloque = 256
+
+# Generador de números aleatorios (fijar la semilla para resultados reproducibles)
+semilla = None
+rng = np.random.default_rng(semilla)
+
+def contar_vecinos_infectados(infectados, r):
+    """ Cuenta para cada celda los infectados a distancia (de Chebyshev) menor o igual a r. """
+    N, M = infectados.shape
+    # Tabla de sumas acumuladas: la suma de cualquier rectángulo sale con 4 accesos
+    acumulada = np.zeros((N + 1, M + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(infectados, axis=0, dtype=np.int32), axis=1, out=acumulada[1:, 1:])
+    fila_ini = np.clip(np.arange(N) - r, 0, N)
+    fila_fin = np.clip(np.arange(N) + r + 1, 0, N)
+    col_ini = np.clip(np.arange(M) - r, 0, M)
+    col_fin = np.clip(np.arange(M) + r + 1, 0, M)
+    return (acumulada[np.ix_(fila_fin, col_fin)] - acumulada[np.ix_(fila_ini, col_fin)]
+            - acumulada[np.ix_(fila_fin, col_ini)] + acumulada[np.ix_(fila_ini, col_ini)])
 
 # Inicializar la grilla
-grilla = np.zeros((N, M))
-infectados_iniciales = np.random.choice(N*M, I0, replace=False)
+grilla = np.zeros((N, M), dtype=np.uint8)  # 0 = S, 1 = I, 2 = R
+infectados_iniciales = rng.choice(N*M, I0, replace=False)
 grilla.ravel()[infectados_iniciales] = 1 
 
-# Listas para almacenar el historial de S, I y R
-S, I, R = [np.sum(grilla == 0)], [np.sum(grilla == 1)], [np.sum(grilla == 2)]
+# Listas para almacenar el historial de S, I y R (los contadores se actualizan
+# con los cambios de cada paso, sin recorrer la grilla)
+S, I, R = [N*M - I0], [I0], [0]
 
 # Función para actualizar la grilla en cada paso de tiempo
 def actualizar_grilla(grilla):
-    nueva_grilla = grilla.copy()
-    for i in range(N):
-        for j in range(M):
-            if grilla[i, j] == 1:  # Infectado
-                for x in range(max(0, i-r), min(N, i+r+1)):
-                    for y in range(max(0, j-r), min(M, j+r+1)):
-                        if grilla[x, y] == 0:  # Susceptible
-                            if np.random.rand() < beta:
-                                nueva_grilla[x, y] = 1
-                if np.random.rand() < gamma:
-                    nueva_grilla[i, j] = 2  # Recuperado
-    return nueva_grilla
-
-# Simulación y animación
-fig, ax = plt.subplots()
-imagen = ax.imshow(grilla, cmap='viridis', animated=True)
-
-def actualizar(frame):
-    global grilla
-    grilla = actualizar_grilla(grilla)
-    imagen.set_array(grilla)
-    S.append(np.sum(grilla == 0))
-    I.append(np.sum(grilla == 1))
-    R.append(np.sum(grilla == 2))
-    return imagen,
-
-animacion = FuncAnimation(fig, actualizar, frames=tiempo_total, interval=200, blit=True)
-plt.show()
+    """ Avanza la grilla un paso en su lugar; devuelve (contagios, recuperaciones). """
+    infectados = grilla == 1
+    # Un susceptible con k infectados en su vecindad recibe k intentos de contagio
+    # independientes, así que se contagia con probabilidad 1 - (1 - beta)^k
+    # (cada paso usa siempre dos arreglos del generador: con la misma semilla se repite)
+    k = contar_vecinos_infectados(infectados, r)
+    contagio = (grilla == 0) & (rng.random(grilla.shape) < 1 - (1 - beta) ** k)
+    recuperacion = infectados & (rng.random(grilla.shape) < gamma)
+    # Las máscaras ya están calculadas, así que la grilla se actualiza en su lugar
+    grilla[contagio] = 1
+    grilla[recuperacion] = 2  # Recuperado
+    return np.count_nonzero(contagio), np.count_nonzero(recuperacion)
+
+# Función para actualizar solo la frontera activa: las vecindades de los infectados
+def actualizar_frontera(grilla, infectados):
+    """
+    Avanza la grilla un paso en su lugar recorriendo solo las vecindades de los infectados,
+    de modo que el costo depende del número de infectados y no del tamaño de la grilla.
+    
+    :param grilla: Grilla (N, M) con los estados 0 = S, 1 = I, 2 = R
+    :param infectados: Índices planos (en grilla.ravel()) de las celdas infectadas
+    :return: Nuevos índices de infectados, número de contagios y de recuperaciones
+    """
+    plano = grilla.reshape(-1)
+    filas, columnas = np.divmod(infectados, M)
+    df, dc = np.meshgrid(np.arange(-r, r + 1), np.arange(-r, r + 1), indexing='ij')
+    vecinos_f = filas[:, None] + df.ravel()
+    vecinos_c = columnas[:, None] + dc.ravel()
+    dentro = (vecinos_f >= 0) & (vecinos_f < N) & (vecinos_c >= 0) & (vecinos_c < M)
+    objetivos = (vecinos_f * M + vecinos_c)[dentro]
+    objetivos = objetivos[plano[objetivos] == 0]  # Solo susceptibles
+    
+    # k = número de infectados vecinos de cada susceptible alcanzado
+    candidatos, k = np.unique(objetivos, return_counts=True)
+    contagio = candidatos[rng.random(len(candidatos)) < 1 - (1 - beta) ** k]
+    recuperacion = rng.random(len(infectados)) < gamma
+    
+    plano[contagio] = 1
+    plano[infectados[recuperacion]] = 2  # Recuperado
+    infectados = np.concatenate((infectados[~recuperacion], contagio))
+    return infectados, len(contagio), np.count_nonzero(recuperacion)
+
+# Índices de las celdas infectadas para el motor de frontera
+infectados = infectados_iniciales
+
+class EscritorFotogramas:
+    """
+    Escribe fotogramas desde un hilo en segundo plano para que la simulación no espere
+    al disco ni al codificador. La cola es acotada: si el escritor se atrasa, la
+    simulación se detiene hasta que haya lugar, así que la memoria no crece sin límite.
+    """
+
+    def __init__(self, prefijo, formato='npz', por_bloque=256, fps=10, escala=8, max_pendientes=64):
+        """
+        :param prefijo: Prefijo de los archivos de salida
+        :param formato: 'npz' (bloques prefijo_00000.npz, ... con los estados uint8) o 'video' (prefijo.mp4)
+        :param por_bloque: Fotogramas por archivo .npz
+        :param fps: Fotogramas por segundo del video
+        :param escala: Píxeles por celda en el video
+        :param max_pendientes: Tamaño máximo de la cola de fotogramas
+        """
+        if formato == 'video' and imageio is None:
+            raise ImportError("El formato 'video' requiere imageio (pip install imageio imageio-ffmpeg)")
+        self.prefijo = prefijo
+        self.formato = formato
+        self.por_bloque = por_bloque
+        self.fps = fps
+        self.escala = escala
+        self.archivos = []
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._error = None
+        self._fin_recibido = False
+        self._hilo = threading.Thread(target=self._escribir, daemon=True)
+        self._hilo.start()
+
+    def agregar(self, t, grilla):
+        """ Encola una copia de la grilla del instante t. """
+        if self._error is not None:
+            raise self._error
+        self._cola.put((t, grilla.copy()))
+
+    def cerrar(self):
+        """ Espera a que se escriban los fotogramas pendientes; devuelve los archivos escritos. """
+        self._cola.put(None)
+        self._hilo.join()
+        if self._error is not None:
+            raise self._error
+        return self.archivos
+
+    def _escribir(self):
+        try:
+            if self.formato == 'video':
+                self._escribir_video()
+            else:
+                self._escribir_npz()
+        except Exception as error:
+            self._error = error
+            # Vaciar la cola para que la simulación no quede bloqueada en put(), salvo
+            # que el error haya sido al escribir después de recibir el fin
+            while not self._fin_recibido and self._siguiente() is not None:
+                pass
+
+    def _siguiente(self):
+        """ Saca el próximo elemento de la cola y recuerda si era la marca de fin (None). """
+        elemento = self._cola.get()
+        if elemento is None:
+            self._fin_recibido = True
+        return elemento
+
+    def _escribir_npz(self):
+        tiempos, fotogramas = [], []
+        while True:
+            elemento = self._siguiente()
+            if elemento is not None:
+                tiempos.append(elemento[0])
+                fotogramas.append(elemento[1])
+            if fotogramas and (elemento is None or len(fotogramas) == self.por_bloque):
+                ruta = f'{self.prefijo}_{len(self.archivos):05d}.npz'
+                np.savez_compressed(ruta, tiempos=np.array(tiempos), fotogramas=np.stack(fotogramas))
+                self.archivos.append(ruta)
+                tiempos, fotogramas = [], []
+            if elemento is None:
+                return
+
+    def _escribir_video(self):
+        # Los colores de cada estado (0, 1, 2) se toman de la misma paleta que la animación
+        paleta = (matplotlib.colormaps['viridis'](np.linspace(0, 1, 3))[:, :3] * 255).astype(np.uint8)
+        ruta = f'{self.prefijo}.mp4'
+        with imageio.get_writer(ruta, fps=self.fps, macro_block_size=1) as video:
+            while (elemento := self._siguiente()) is not None:
+                cuadro = paleta[elemento[1]]
+                video.append_data(np.repeat(np.repeat(cuadro, self.escala, axis=0), self.escala, axis=1))
+        self.archivos.append(ruta)
+
+def avanzar():
+    """ Avanza la simulación un paso con el motor elegido y actualiza los contadores. """
+    global infectados
+    if motor == 'frontera':
+        infectados, contagios, recuperaciones = actualizar_frontera(grilla, infectados)
+    else:
+        contagios, recuperaciones = actualizar_grilla(grilla)
+    S.append(S[-1] - contagios)
+    I.append(I[-1] + contagios - recuperaciones)
+    R.append(R[-1] + recuperaciones)
+
+if modo == 'sin_ventana':
+    # Simulación sin interfaz: el único límite es el motor (y el escritor, si se atrasa)
+    escritor = EscritorFotogramas(salida, formato, fotogramas_por_bloque) if formato else None
+    if escritor:
+        escritor.agregar(0, grilla)
+    for t in range(1, tiempo_total + 1):
+        avanzar()
+        if escritor:
+            escritor.agregar(t, grilla)
+    if escritor:
+        print('Fotogramas escritos en:', ', '.join(escritor.cerrar()))
+else:
+    # Simulación y animación
+    fig, ax = plt.subplots()
+    imagen = ax.imshow(grilla, cmap='viridis', vmin=0, vmax=2, animated=True)
+
+    def actualizar(frame):
+        avanzar()
+        imagen.set_array(grilla)
+        return imagen,
+
+    animacion = FuncAnimation(fig, actualizar, frames=tiempo_total, interval=200, blit=True)
+    plt.show()
 
 # Graficar S, I y R
 plt.figure()
@@ -58,4 +232,7 @@ plt.xlabel('Tiempo')
 plt.ylabel('Población')
 plt.legend()
 plt.title('Dinámica del Modelo SIR')
-plt.show()
+if modo == 'sin_ventana':
+    plt.savefig(f'{salida}_curvas.png')
+else:
+    plt.show()
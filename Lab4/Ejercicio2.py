@@ -1,3 +1,6 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
@@ -15,63 +18,212 @@ betas = [0.05, 0.1, 0.2]
 gammas = [0.1, 0.25, 0.5]
 radios = [1, 2, 3]
 
-# Almacenar resultados para diferentes parámetros
-resultados = {}
-
-for beta in betas:
-    for gamma in gammas:
-        for r in radios:
-            # Almacenar resultados de todas las simulaciones para esta combinación de parámetros
-            all_S, all_I, all_R = [], [], []
-
-            for _ in range(N_exp):
-                # Inicializar la grilla
-                grilla = np.zeros((N, M))
-                infectados_iniciales = np.random.choice(N*M, I0, replace=False)
-                grilla.ravel()[infectados_iniciales] = 1
-
-                # Listas para almacenar el historial de S, I y R
-                S, I, R = [np.sum(grilla == 0)], [np.sum(grilla == 1)], [np.sum(grilla == 2)]
-
-                # Función para actualizar la grilla en cada paso de tiempo
-                def actualizar_grilla(grilla):
-                    nueva_grilla = grilla.copy()
-                    for i in range(N):
-                        for j in range(M):
-                            if grilla[i, j] == 1:  # Infectado
-                                for x in range(max(0, i-r), min(N, i+r+1)):
-                                    for y in range(max(0, j-r), min(M, j+r+1)):
-                                        if grilla[x, y] == 0:  # Susceptible
-                                            if np.random.rand() < beta:
-                                                nueva_grilla[x, y] = 1
-                            if grilla[i, j] == 1 and np.random.rand() < gamma:
-                                nueva_grilla[i, j] = 2  # Recuperado
-                    return nueva_grilla
-
-                # Simulación (sin animación en este bucle)
-                for _ in range(tiempo_total):
-                    grilla = actualizar_grilla(grilla)
-                    S.append(np.sum(grilla == 0))
-                    I.append(np.sum(grilla == 1))
-                    R.append(np.sum(grilla == 2))
-
-                all_S.append(S)
-                all_I.append(I)
-                all_R.append(R)
-
-            # Calcular promedios
-            avg_S = np.mean(all_S, axis=0)
-            avg_I = np.mean(all_I, axis=0)
-            avg_R = np.mean(all_R, axis=0)
-
-            resultados[(beta, gamma, r)] = (avg_S, avg_I, avg_R)
-
-# Graficar resultados para diferentes parámetros
-plt.figure()
-for (beta, gamma, r), (S, I, R) in resultados.items():
-    plt.plot(I, label=f'Infectados (β={beta}, γ={gamma}, r={r})')
-plt.xlabel('Tiempo')
-plt.ylabel('Población')
-plt.legend()
-plt.title('Influencia de β, γ y r en la dinámica de infectados')
-plt.show()
\ No newline at end of file
+# Semilla raíz: cada réplica recibe su propio flujo independiente derivado de ella
+# (fijar un entero para resultados reproducibles)
+semilla = None
+
+# Réplicas por tarea enviada a los procesos, y tareas en vuelo por proceso
+replicas_por_tarea = 5
+tareas_por_proceso = 2
+
+def contar_vecinos_infectados(infectados, r):
+    """ Cuenta para cada celda los infectados a distancia (de Chebyshev) menor o igual a r. """
+    N, M = infectados.shape
+    # Tabla de sumas acumuladas: la suma de cualquier rectángulo sale con 4 accesos
+    acumulada = np.zeros((N + 1, M + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(infectados, axis=0, dtype=np.int32), axis=1, out=acumulada[1:, 1:])
+    fila_ini = np.clip(np.arange(N) - r, 0, N)
+    fila_fin = np.clip(np.arange(N) + r + 1, 0, N)
+    col_ini = np.clip(np.arange(M) - r, 0, M)
+    col_fin = np.clip(np.arange(M) + r + 1, 0, M)
+    return (acumulada[np.ix_(fila_fin, col_fin)] - acumulada[np.ix_(fila_ini, col_fin)]
+            - acumulada[np.ix_(fila_fin, col_ini)] + acumulada[np.ix_(fila_ini, col_ini)])
+
+# Función para actualizar la grilla en cada paso de tiempo
+def actualizar_grilla(grilla, beta, gamma, r, rng):
+    """ Avanza la grilla un paso en su lugar; devuelve (contagios, recuperaciones). """
+    infectados = grilla == 1
+    # Un susceptible con k infectados en su vecindad recibe k intentos de contagio
+    # independientes, así que se contagia con probabilidad 1 - (1 - beta)^k
+    # (cada paso usa siempre dos arreglos del generador: con la misma semilla se repite)
+    k = contar_vecinos_infectados(infectados, r)
+    contagio = (grilla == 0) & (rng.random(grilla.shape) < 1 - (1 - beta) ** k)
+    recuperacion = infectados & (rng.random(grilla.shape) < gamma)
+    # Las máscaras ya están calculadas, así que la grilla se actualiza en su lugar
+    grilla[contagio] = 1
+    grilla[recuperacion] = 2  # Recuperado
+    return np.count_nonzero(contagio), np.count_nonzero(recuperacion)
+
+def simular(beta, gamma, r, rng):
+    """ Una simulación completa; devuelve un arreglo (3, tiempo_total + 1) con S, I y R. """
+    # Inicializar la grilla
+    grilla = np.zeros((N, M), dtype=np.uint8)  # 0 = S, 1 = I, 2 = R
+    infectados_iniciales = rng.choice(N*M, I0, replace=False)
+    grilla.ravel()[infectados_iniciales] = 1
+
+    # Historial de S, I y R
+    historial = np.empty((3, tiempo_total + 1), dtype=np.int64)
+    historial[:, 0] = N*M - I0, I0, 0
+
+    # Simulación (sin animación en este bucle)
+    for t in range(1, tiempo_total + 1):
+        contagios, recuperaciones = actualizar_grilla(grilla, beta, gamma, r, rng)
+        historial[0, t] = historial[0, t - 1] - contagios
+        historial[1, t] = historial[1, t - 1] + contagios - recuperaciones
+        historial[2, t] = historial[2, t - 1] + recuperaciones
+    return historial
+
+def simular_replicas(beta, gamma, r, semillas):
+    """
+    Corre un bloque de réplicas.
+
+    :param semillas: Lista de np.random.SeedSequence, una por réplica
+    :return: Arreglo (len(semillas), 3, tiempo_total + 1) con S, I y R de cada réplica
+    """
+    return np.stack([simular(beta, gamma, r, np.random.default_rng(s)) for s in semillas])
+
+class AcumuladorSIR:
+    """
+    Resume en línea las réplicas de S, I y R sin guardarlas: media y varianza por
+    Welford, cuantiles por el algoritmo P² (Jain y Chlamtac, 1985) y el instante del
+    pico de infectados. La memoria es O(pasos) sin importar cuántas réplicas se agreguen.
+    """
+
+    def __init__(self, pasos, cuantiles=(0.05, 0.5, 0.95)):
+        """
+        :param pasos: Número de instantes de cada historial (tiempo_total + 1)
+        :param cuantiles: Probabilidades de los cuantiles a estimar en cada instante
+        """
+        self.n = 0
+        self.cuantiles = tuple(cuantiles)
+        self.media = np.zeros((3, pasos))
+        self.m2 = np.zeros((3, pasos))
+        # Histograma del instante del pico de infectados y Welford de (instante, altura)
+        self.picos = np.zeros(pasos, dtype=np.int64)
+        self.pico_media = np.zeros(2)
+        self.pico_m2 = np.zeros(2)
+        # P²: cinco marcadores por cuantil y por celda (cuantil, marcador, S/I/R, tiempo)
+        p = np.asarray(cuantiles, dtype=float)[:, None, None, None]
+        self._dn = np.concatenate([np.zeros_like(p), p / 2, p, (1 + p) / 2, np.ones_like(p)], axis=1)
+        self._deseada = 1 + 4 * self._dn
+        self._q = np.zeros((len(self.cuantiles), 5, 3, pasos))
+        self._pos = np.tile(np.arange(1.0, 6.0)[None, :, None, None], (len(self.cuantiles), 1, 3, pasos))
+
+    def agregar(self, historial):
+        """ Incorpora una réplica (3, pasos) con S, I y R. """
+        x = np.asarray(historial, dtype=float)
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+
+        pico = np.array([np.argmax(x[1]), x[1].max()])
+        self.picos[int(pico[0])] += 1
+        delta = pico - self.pico_media
+        self.pico_media += delta / self.n
+        self.pico_m2 += delta * (pico - self.pico_media)
+
+        self._actualizar_p2(x)
+
+    def _actualizar_p2(self, x):
+        """ Un paso del algoritmo P², vectorizado sobre cuantiles, variables e instantes. """
+        q, pos = self._q, self._pos
+        if self.n <= 5:
+            # Las primeras cinco observaciones son los marcadores iniciales
+            q[:, self.n - 1] = x
+            if self.n == 5:
+                q.sort(axis=1)
+            return
+        x = np.broadcast_to(x, q[:, 0].shape)
+        np.minimum(q[:, 0], x, out=q[:, 0])
+        np.maximum(q[:, 4], x, out=q[:, 4])
+        # k tal que q[k] <= x < q[k+1]: se corren los marcadores de k+1 en adelante
+        k = np.sum(x[:, None] >= q[:, 1:4], axis=1)
+        pos += np.arange(5)[None, :, None, None] > k[:, None]
+        self._deseada += self._dn
+
+        # Ajustar los marcadores interiores que se alejaron de su posición deseada
+        for i in range(1, 4):
+            d = self._deseada[:, i] - pos[:, i]
+            mover = (((d >= 1) & (pos[:, i + 1] - pos[:, i] > 1))
+                     | ((d <= -1) & (pos[:, i - 1] - pos[:, i] < -1)))
+            if not mover.any():
+                continue
+            s = np.sign(d)
+            qa, qi, qs = q[:, i - 1], q[:, i], q[:, i + 1]
+            na, ni, ns = pos[:, i - 1], pos[:, i], pos[:, i + 1]
+            parabolica = qi + s / (ns - na) * ((ni - na + s) * (qs - qi) / (ns - ni)
+                                               + (ns - ni - s) * (qi - qa) / (ni - na))
+            lineal = qi + s * (np.where(s > 0, qs, qa) - qi) / (np.where(s > 0, ns, na) - ni)
+            nuevo = np.where((qa < parabolica) & (parabolica < qs), parabolica, lineal)
+            q[:, i] = np.where(mover, nuevo, qi)
+            pos[:, i] += np.where(mover, s, 0)
+
+    def varianza(self):
+        """ Varianza muestral (3, pasos) de S, I y R. """
+        return self.m2 / (self.n - 1) if self.n > 1 else np.zeros_like(self.m2)
+
+    def estimar_cuantiles(self):
+        """ Estimaciones (len(cuantiles), 3, pasos); con menos de 5 réplicas son exactas. """
+        if self.n >= 5:
+            return self._q[:, 2].copy()
+        return np.quantile(self._q[0, :self.n], self.cuantiles, axis=0)
+
+    def pico(self):
+        """ Media y varianza del instante y de la altura del pico de infectados. """
+        varianza = self.pico_m2 / (self.n - 1) if self.n > 1 else np.zeros(2)
+        return {'instante': (self.pico_media[0], varianza[0]), 'altura': (self.pico_media[1], varianza[1])}
+
+if __name__ == "__main__":
+    # Tareas (parámetros, bloque de réplicas), cada réplica con su propia semilla
+    celdas = [(beta, gamma, r) for beta in betas for gamma in gammas for r in radios]
+    semillas_celdas = np.random.SeedSequence(semilla).spawn(len(celdas))
+    tareas = []
+    for celda, semilla_celda in zip(celdas, semillas_celdas):
+        semillas = semilla_celda.spawn(N_exp)
+        for i in range(0, N_exp, replicas_por_tarea):
+            tareas.append((celda, semillas[i:i + replicas_por_tarea]))
+
+    # Cada celda tiene un acumulador. Solo hay una ventana acotada de tareas en vuelo
+    # y sus resultados se consumen en el orden de las tareas y se descartan: la memoria
+    # no crece con N_exp, y como P² depende del orden de llegada, con una semilla fija
+    # los cuantiles son reproducibles
+    acumulados = {celda: AcumuladorSIR(tiempo_total + 1) for celda in celdas}
+    procesos = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        pendientes = iter(tareas)
+        en_vuelo = deque()
+        for celda, semillas in pendientes:
+            en_vuelo.append((celda, ejecutor.submit(simular_replicas, *celda, semillas)))
+            if len(en_vuelo) == procesos * tareas_por_proceso:
+                break
+        while en_vuelo:
+            celda, futuro = en_vuelo.popleft()
+            for historial in futuro.result():
+                acumulados[celda].agregar(historial)
+            del futuro
+            for celda, semillas in pendientes:
+                en_vuelo.append((celda, ejecutor.submit(simular_replicas, *celda, semillas)))
+                break
+
+    # Almacenar resultados para diferentes parámetros: promedios, varianzas y cuantiles de S, I y R
+    resultados = {}
+    varianzas = {}
+    cuantiles = {}
+    for celda, acumulador in acumulados.items():
+        resultados[celda] = tuple(acumulador.media)
+        varianzas[celda] = tuple(acumulador.varianza())
+        cuantiles[celda] = acumulador.estimar_cuantiles()
+        (instante, var_instante), (altura, _) = acumulador.pico().values()
+        print(f'β={celda[0]}, γ={celda[1]}, r={celda[2]}: pico de infectados en t={instante:.1f} '
+              f'(desv. {np.sqrt(var_instante):.1f}) con {altura:.1f} infectados en promedio')
+
+    # Graficar resultados para diferentes parámetros
+    plt.figure()
+    for (beta, gamma, r), (S, I, R) in resultados.items():
+        plt.plot(I, label=f'Infectados (β={beta}, γ={gamma}, r={r})')
+    plt.xlabel('Tiempo')
+    plt.ylabel('Población')
+    plt.legend()
+    plt.title('Influencia de β, γ y r en la dinámica de infectados')
+    plt.show()
@@ -13,52 +13,68 @@ I0 = 2          # Número inicial de infectados
 # Número de experimentos
 Nexp = 10
 
-# Generar posiciones iniciales aleatorias (una sola vez)
-posiciones_iniciales = [(np.random.randint(N), np.random.randint(M)) for _ in range(I0)]
+# Generador de números aleatorios (fijar la semilla para resultados reproducibles)
+semilla = None
+rng = np.random.default_rng(semilla)
+
+def contar_vecinos_infectados(infectados, r):
+    """
+    Cuenta para cada celda los infectados a distancia (de Chebyshev) menor o igual a r.
+    Acepta una grilla (N, M) o un lote de grillas (Nexp, N, M).
+    """
+    N, M = infectados.shape[-2:]
+    # Tabla de sumas acumuladas: la suma de cualquier rectángulo sale con 4 accesos
+    acumulada = np.zeros(infectados.shape[:-2] + (N + 1, M + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(infectados, axis=-2, dtype=np.int32), axis=-1, out=acumulada[..., 1:, 1:])
+    fila_ini = np.clip(np.arange(N) - r, 0, N)[:, None]
+    fila_fin = np.clip(np.arange(N) + r + 1, 0, N)[:, None]
+    col_ini = np.clip(np.arange(M) - r, 0, M)[None, :]
+    col_fin = np.clip(np.arange(M) + r + 1, 0, M)[None, :]
+    return (acumulada[..., fila_fin, col_fin] - acumulada[..., fila_ini, col_fin]
+            - acumulada[..., fila_fin, col_ini] + acumulada[..., fila_ini, col_ini])
 
-# Lista para almacenar los historiales de todos los experimentos
-historiales_grillas = []
+# Generar posiciones iniciales aleatorias (una sola vez)
+posiciones_iniciales = [(rng.integers(N), rng.integers(M)) for _ in range(I0)]
 
 # Función para actualizar la grilla en cada paso de tiempo
 def actualizar_grilla(grilla):
-    nueva_grilla = grilla.copy()
-    for i in range(N):
-        for j in range(M):
-            if grilla[i, j] == 1:  # Infectado
-                for x in range(max(0, i-r), min(N, i+r+1)):
-                    for y in range(max(0, j-r), min(M, j+r+1)):
-                        if grilla[x, y] == 0:  # Susceptible
-                            if np.random.rand() < beta:
-                                nueva_grilla[x, y] = 1
-                if np.random.rand() < gamma:
-                    nueva_grilla[i, j] = 2  # Recuperado
-    return nueva_grilla
-
-# Bucle para realizar múltiples experimentos
-for _ in range(Nexp):
-    # Inicializar la grilla
-    grilla = np.zeros((N, M))
-    for i, j in posiciones_iniciales:
-        grilla[i, j] = 1
-
-    # Listas para almacenar el historial de S, I y R de este experimento
-    S, I, R = [np.sum(grilla == 0)], [np.sum(grilla == 1)], [np.sum(grilla == 2)]
-
-    # Simulación (sin animación en este caso, solo cálculo)
-    for _ in range(tiempo_total):
-        grilla = actualizar_grilla(grilla)
-        S.append(np.sum(grilla == 0))
-        I.append(np.sum(grilla == 1))
-        R.append(np.sum(grilla == 2))
+    """
+    Avanza todas las réplicas (Nexp, N, M) un paso en su lugar.
+    Devuelve los contagios y las recuperaciones de cada réplica.
+    """
+    infectados = grilla == 1
+    # Un susceptible con k infectados en su vecindad recibe k intentos de contagio
+    # independientes, así que se contagia con probabilidad 1 - (1 - beta)^k
+    # (cada paso usa siempre dos arreglos del generador: con la misma semilla se repite)
+    k = contar_vecinos_infectados(infectados, r)
+    contagio = (grilla == 0) & (rng.random(grilla.shape) < 1 - (1 - beta) ** k)
+    recuperacion = infectados & (rng.random(grilla.shape) < gamma)
+    # Las máscaras ya están calculadas, así que la grilla se actualiza en su lugar
+    grilla[contagio] = 1
+    grilla[recuperacion] = 2  # Recuperado
+    return np.count_nonzero(contagio, axis=(1, 2)), np.count_nonzero(recuperacion, axis=(1, 2))
 
-    # Almacenar el historial de este experimento
-    historiales_grillas.append(np.array([S, I, R]))
+# Inicializar todas las réplicas a la vez: la primera dimensión es el experimento
+grillas = np.zeros((Nexp, N, M), dtype=np.uint8)  # 0 = S, 1 = I, 2 = R
+for i, j in posiciones_iniciales:
+    grillas[:, i, j] = 1
 
-# Convertir la lista de historiales en un array NumPy
-historiales_grillas = np.array(historiales_grillas)
+# Contadores de S, I y R de cada réplica (las posiciones iniciales pueden repetirse,
+# por eso se cuentan una vez); solo se guarda el promedio de cada instante
+infectados_0 = np.count_nonzero(grillas[0])
+S = np.full(Nexp, N*M - infectados_0)
+I = np.full(Nexp, infectados_0)
+R = np.zeros(Nexp, dtype=int)
+promedio_grillas = np.empty((3, tiempo_total + 1))
+promedio_grillas[:, 0] = S.mean(), I.mean(), R.mean()
 
-# Calcular el promedio a lo largo del eje de los experimentos
-promedio_grillas = np.mean(historiales_grillas, axis=0)
+# Simulación de todas las réplicas juntas (sin animación, solo cálculo)
+for t in range(1, tiempo_total + 1):
+    contagios, recuperaciones = actualizar_grilla(grillas)
+    S -= contagios
+    I += contagios - recuperaciones
+    R += recuperaciones
+    promedio_grillas[:, t] = S.mean(), I.mean(), R.mean()
 
 # Graficar el promedio de S, I y R
 plt.figure()
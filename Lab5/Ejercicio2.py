@@ -1,6 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
-import random
+
+# Generador de números aleatorios (fijar la semilla para resultados reproducibles)
+semilla = None
+rng = np.random.default_rng(semilla)
 
 def get_particle_neighbors(x, y, M, N, neigh):
     """ Devuelve los vecinos posibles para una partícula. """
@@ -10,31 +13,97 @@ def get_particle_neighbors(x, y, M, N, neigh):
         return [(x+1, y), (x-1, y), (x, y+1), (x, y-1), 
                 (x+1, y+1), (x-1, y-1), (x+1, y-1), (x-1, y+1)]
 
-def particle_diffusion(M, N, T, P, K, Nexp, neigh):
-    history = np.zeros((M, N, T))  # Mantener historial de cada repetición
+def move_particles(particles, K, offsets, M, N):
+    """
+    Mueve todas las partículas un paso en su lugar: cada una, con probabilidad K,
+    salta a un vecino elegido al azar (con borde periódico).
+
+    :param particles: Arreglo (P, 2) int32 con las posiciones
+    :param offsets: Arreglo (vecinos, 2) con los desplazamientos de la vecindad
+    """
+    moving = rng.random(len(particles)) < K
+    choice = rng.integers(0, len(offsets), np.count_nonzero(moving))
+    particles[moving] = (particles[moving] + offsets[choice]) % (M, N)
+    return particles
+
+def occupancy(particles, M, N):
+    """ Cuenta las partículas en cada celda con np.bincount sobre índices planos. """
+    flat = np.ravel_multi_index((particles[:, 0], particles[:, 1]), (M, N))
+    return np.bincount(flat, minlength=M*N).reshape(M, N)
+
+class ParticleHistory:
+    """
+    Historial compacto de la difusión de partículas: guarda los conteos acumulados
+    como enteros, solo en los instantes pedidos y, opcionalmente, en un archivo
+    mapeado en memoria. El promedio (dividir por Nexp) y la normalización se hacen
+    al leer, y solo sobre la rebanada pedida.
+
+    Internamente se guarda como (instantes, M, N), así cada instante es un bloque
+    contiguo (en disco, una sola región del archivo); history[:, :, t] conserva el
+    orden (M, N, T) de antes.
+    """
+
+    def __init__(self, M, N, times, Nexp, dtype=np.int32, path=None):
+        """
+        :param times: Instantes a conservar
+        :param dtype: Tipo entero de los conteos (int32 alcanza mientras P*T*Nexp < 2^31; si no, int64)
+        :param path: Ruta .npy para volcar los conteos a disco con np.memmap (None: en memoria)
+        """
+        self.times = sorted(set(times))
+        self.index = {t: i for i, t in enumerate(self.times)}
+        self.Nexp = Nexp
+        shape = (len(self.times), M, N)
+        if path is None:
+            self.counts = np.zeros(shape, dtype=dtype)
+        else:
+            self.counts = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+
+    def add(self, t, grid):
+        """ Suma el grid acumulado del instante t si es uno de los que se conservan. """
+        i = self.index.get(t)
+        if i is not None:
+            self.counts[i] += grid
+
+    def __getitem__(self, key):
+        """
+        history[:, :, t] devuelve el promedio sobre las repeticiones en el instante t;
+        con t una rebanada (history[:, :, a:b]) devuelve un arreglo (M, N, k). Pedir un
+        instante que no se conservó da KeyError.
+        """
+        filas, columnas, t = key
+        if isinstance(t, slice):
+            indices = [self.index[s] for s in range(*t.indices(self.times[-1] + 1 if self.times else 0))]
+            return np.moveaxis(self.counts[indices][:, filas, columnas], 0, -1) / self.Nexp
+        return self.counts[self.index[t]][filas, columnas] / self.Nexp
+
+    def normalized(self, t):
+        """ Distribución normalizada en el instante t. """
+        return normalize_grid(self.counts[self.index[t]])
+
+def particle_diffusion(M, N, T, P, K, Nexp, neigh, times=None, dtype=np.int32, path=None):
+    """
+    Difusión de partículas repetida Nexp veces.
+
+    :param times: Instantes a conservar (por defecto todos)
+    :param dtype: Tipo entero de los conteos
+    :param path: Ruta .npy para volcar el historial a disco (None: en memoria)
+    :return: ParticleHistory; history[:, :, t] es el promedio de las repeticiones
+    """
+    # Mantener historial de cada repetición: conteos enteros, solo en los instantes pedidos
+    history = ParticleHistory(M, N, range(T) if times is None else times, Nexp, dtype, path)
+    # Desplazamientos de la vecindad, tomados de get_particle_neighbors alrededor de (0, 0)
+    offsets = np.array(get_particle_neighbors(0, 0, M, N, neigh), dtype=np.int32)
     
     for exp in range(Nexp):
-        grid = np.zeros((M, N))  # Grid para una simulación
-        particles = [(random.randint(0, M-1), random.randint(0, N-1)) for _ in range(P)]
+        grid = np.zeros((M, N), dtype=np.int64)  # Grid para una simulación
+        particles = np.column_stack((rng.integers(0, M, P), rng.integers(0, N, P))).astype(np.int32)
         
         for t in range(T):
-            new_particles = []
-            for (x, y) in particles:
-                if random.random() < K:
-                    neighbors = get_particle_neighbors(x, y, M, N, neigh)
-                    move = random.choice(neighbors)
-                    x_new = move[0] % M
-                    y_new = move[1] % N
-                else:
-                    x_new, y_new = x, y
-                
-                new_particles.append((x_new, y_new))
-                grid[x_new, y_new] += 1
-            
-            particles = new_particles
-            history[:, :, t] += grid  # Acumular resultados en la historia
+            move_particles(particles, K, offsets, M, N)
+            grid += occupancy(particles, M, N)
+            history.add(t, grid)  # Acumular resultados en la historia
     
-    return history / Nexp  # Promedio de las simulaciones
+    return history  # El promedio de las simulaciones se calcula al leer
 
 def normalize_grid(grid):
     """ Normaliza el grid dividiendo por la suma total de partículas. """
@@ -46,7 +115,7 @@ def normalize_grid(grid):
 def plot_average_diffusion(history, T):
     """ Graficar el promedio espacial en diferentes instantes de tiempo. """
     for t in range(0, T, 25):
-        norm_grid = normalize_grid(history[:, :, t])
+        norm_grid = history.normalized(t)
         plt.imshow(norm_grid, cmap='hot', interpolation='nearest')
         plt.title(f'Time {t}')
         plt.colorbar()
@@ -61,7 +130,7 @@ Nexp = 5 # Número de experimentos
 neigh = 8  # Vecindad de 8 vecinos
 
 # Simulación de difusión usando partículas con promedio
-history = particle_diffusion(M, N, T, P, K, Nexp, neigh)
+history = particle_diffusion(M, N, T, P, K, Nexp, neigh, times=range(0, T, 25))
 
 # Graficar el promedio espacial
 plot_average_diffusion(history, T)
\ No newline at end of file